@@ -24,8 +24,13 @@ def upgrade() -> None:
     # Add handoff columns to conversations table
     op.add_column('conversations', sa.Column('handoff_status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='ai'))
     op.add_column('conversations', sa.Column('assigned_to_user_uuid', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
-    op.create_index(op.f('ix_conversations_assigned_to_user_uuid'), 'conversations', ['assigned_to_user_uuid'], unique=False)
-    op.create_foreign_key('fk_conversations_assigned_to_user_uuid_users', 'conversations', 'users', ['assigned_to_user_uuid'], ['uuid'])
+    # Add the foreign key without checking existing rows; it is validated
+    # below once the lock taken by the new columns has been released
+    op.execute("""
+        ALTER TABLE conversations
+        ADD CONSTRAINT fk_conversations_assigned_to_user_uuid_users
+        FOREIGN KEY (assigned_to_user_uuid) REFERENCES users (uuid) NOT VALID
+    """)
     
     # Create handoff_requests table
     op.create_table('handoff_requests',
@@ -38,14 +43,25 @@ def upgrade() -> None:
         sa.Column('accepted_by_user_uuid', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
         sa.Column('resolved_at', sa.DateTime(), nullable=True),
         sa.Column('reason', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['conversation_uuid'], ['conversations.uuid'], name='fk_handoff_requests_conversation_uuid_conversations'),
+        sa.ForeignKeyConstraint(['chatbot_uuid'], ['chatbots.uuid'], name='fk_handoff_requests_chatbot_uuid_chatbots'),
+        sa.ForeignKeyConstraint(['accepted_by_user_uuid'], ['users.uuid'], name='fk_handoff_requests_accepted_by_user_uuid_users'),
+        sa.Index(op.f('ix_handoff_requests_conversation_uuid'), 'conversation_uuid'),
+        # Pending requests are listed per chatbot
+        sa.Index('ix_handoff_requests_chatbot_uuid_status', 'chatbot_uuid', 'status'),
+        # Only open requests are looked up by agent, so resolved ones stay out of the index
+        sa.Index(
+            'ix_handoff_requests_accepted_user_open', 'accepted_by_user_uuid',
+            postgresql_where=sa.text("status IN ('pending', 'accepted')")
+        ),
     )
-    op.create_index(op.f('ix_handoff_requests_conversation_uuid'), 'handoff_requests', ['conversation_uuid'], unique=False)
-    op.create_index(op.f('ix_handoff_requests_chatbot_uuid'), 'handoff_requests', ['chatbot_uuid'], unique=False)
-    op.create_index(op.f('ix_handoff_requests_accepted_by_user_uuid'), 'handoff_requests', ['accepted_by_user_uuid'], unique=False)
-    op.create_foreign_key('fk_handoff_requests_conversation_uuid_conversations', 'handoff_requests', 'conversations', ['conversation_uuid'], ['uuid'])
-    op.create_foreign_key('fk_handoff_requests_chatbot_uuid_chatbots', 'handoff_requests', 'chatbots', ['chatbot_uuid'], ['uuid'])
-    op.create_foreign_key('fk_handoff_requests_accepted_by_user_uuid_users', 'handoff_requests', 'users', ['accepted_by_user_uuid'], ['uuid'])
+    
+    # Validate the foreign key and build the conversations index without
+    # blocking writes; CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE conversations VALIDATE CONSTRAINT fk_conversations_assigned_to_user_uuid_users")
+        op.create_index(op.f('ix_conversations_assigned_to_user_uuid'), 'conversations', ['assigned_to_user_uuid'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
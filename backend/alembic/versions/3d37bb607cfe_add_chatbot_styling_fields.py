@@ -20,13 +20,16 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # Add styling customization columns to chatbots table
-    op.add_column('chatbots', sa.Column('color_primary', sa.String(length=7), nullable=False, server_default='#000000'))
-    op.add_column('chatbots', sa.Column('color_user_message', sa.String(length=7), nullable=False, server_default='#000000'))
-    op.add_column('chatbots', sa.Column('color_bot_message', sa.String(length=7), nullable=False, server_default='#F3F4F6'))
-    op.add_column('chatbots', sa.Column('color_background', sa.String(length=7), nullable=False, server_default='#FFFFFF'))
-    op.add_column('chatbots', sa.Column('border_radius_chatbot', sa.Integer(), nullable=False, server_default='16'))
-    op.add_column('chatbots', sa.Column('border_radius_messages', sa.Integer(), nullable=False, server_default='16'))
+    # Add styling customization columns to chatbots table in a single ALTER TABLE
+    op.execute("""
+        ALTER TABLE chatbots
+            ADD COLUMN color_primary VARCHAR(7) NOT NULL DEFAULT '#000000',
+            ADD COLUMN color_user_message VARCHAR(7) NOT NULL DEFAULT '#000000',
+            ADD COLUMN color_bot_message VARCHAR(7) NOT NULL DEFAULT '#F3F4F6',
+            ADD COLUMN color_background VARCHAR(7) NOT NULL DEFAULT '#FFFFFF',
+            ADD COLUMN border_radius_chatbot INTEGER NOT NULL DEFAULT 16,
+            ADD COLUMN border_radius_messages INTEGER NOT NULL DEFAULT 16
+    """)
 
 
 def downgrade() -> None:
@@ -21,11 +21,14 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # Add dark mode color columns to chatbots table
-    op.add_column('chatbots', sa.Column('color_primary_dark', sqlmodel.sql.sqltypes.AutoString(length=7), nullable=True))
-    op.add_column('chatbots', sa.Column('color_user_message_dark', sqlmodel.sql.sqltypes.AutoString(length=7), nullable=True))
-    op.add_column('chatbots', sa.Column('color_bot_message_dark', sqlmodel.sql.sqltypes.AutoString(length=7), nullable=True))
-    op.add_column('chatbots', sa.Column('color_background_dark', sqlmodel.sql.sqltypes.AutoString(length=7), nullable=True))
+    # Add dark mode color columns to chatbots table in a single ALTER TABLE
+    op.execute("""
+        ALTER TABLE chatbots
+            ADD COLUMN color_primary_dark VARCHAR(7),
+            ADD COLUMN color_user_message_dark VARCHAR(7),
+            ADD COLUMN color_bot_message_dark VARCHAR(7),
+            ADD COLUMN color_background_dark VARCHAR(7)
+    """)
 
 
 def downgrade() -> None:
@@ -20,21 +20,22 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # Update Basic plan (id=1) to have 50 credits
-    op.execute("""
-        UPDATE plans 
-        SET name = 'basic',
-            display_name = 'Basic',
-            message_credits = 50,
-            features = '{"features": ["50 messages/month", "1 chatbot", "Basic support"]}'
-        WHERE id = 1
-    """)
-    
-    # Update existing users on Basic plan to have 50 credits (cap at 50 if they have more)
+    # Update Basic plan (id=1) to have 50 credits and cap existing Basic users
+    # at 50 in the same statement (users.plan_id is indexed by ix_users_plan_id)
     op.execute("""
+        WITH basic_plan AS (
+            UPDATE plans 
+            SET name = 'basic',
+                display_name = 'Basic',
+                message_credits = 50,
+                features = '{"features": ["50 messages/month", "1 chatbot", "Basic support"]}'
+            WHERE id = 1
+            RETURNING id
+        )
         UPDATE users 
-        SET message_credits_remaining = LEAST(message_credits_remaining, 50)
-        WHERE plan_id = 1 AND message_credits_remaining > 50
+        SET message_credits_remaining = 50
+        FROM basic_plan
+        WHERE users.plan_id = basic_plan.id AND users.message_credits_remaining > 50
     """)
 
 
@@ -51,6 +51,7 @@ def upgrade() -> None:
         sa.column('created_at', sa.DateTime)
     )
     
+    now = datetime.utcnow()
     op.bulk_insert(plans_table, [
         {
             'id': 1,
@@ -61,7 +62,7 @@ def upgrade() -> None:
             'message_credits': 50,
             'features': '{"features": ["50 messages/month", "1 chatbot", "Basic support"]}',
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': now
         },
         {
             'id': 2,
@@ -72,7 +73,7 @@ def upgrade() -> None:
             'message_credits': 1000,
             'features': '{"features": ["1,000 messages/month", "3 chatbots", "Priority support", "Custom branding"]}',
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': now
         },
         {
             'id': 3,
@@ -83,7 +84,7 @@ def upgrade() -> None:
             'message_credits': 5000,
             'features': '{"features": ["5,000 messages/month", "10 chatbots", "Priority support", "Custom branding", "Advanced analytics"]}',
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': now
         },
         {
             'id': 4,
@@ -94,7 +95,7 @@ def upgrade() -> None:
             'message_credits': 20000,
             'features': '{"features": ["20,000 messages/month", "Unlimited chatbots", "24/7 support", "Custom branding", "Advanced analytics", "Dedicated account manager"]}',
             'is_active': True,
-            'created_at': datetime.utcnow()
+            'created_at': now
         }
     ])
     
@@ -23,7 +23,11 @@ def upgrade() -> None:
     """Upgrade schema."""
     # Add client_uuid column to conversations table
     op.add_column('conversations', sa.Column('client_uuid', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True))
-    op.create_index(op.f('ix_conversations_client_uuid'), 'conversations', ['client_uuid'], unique=False)
+    
+    # Build the index without blocking writes to conversations; CONCURRENTLY
+    # cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_conversations_client_uuid'), 'conversations', ['client_uuid'], unique=False, postgresql_concurrently=True)
 
 
 def downgrade() -> None:
@@ -0,0 +1,43 @@
+"""add_conversation_listing_indexes
+
+Revision ID: conversation_listing_indexes_001
+Revises: topic_question_centroids_001
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'conversation_listing_indexes_001'
+down_revision: Union[str, Sequence[str], None] = 'topic_question_centroids_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the conversation listings and their message previews."""
+    with op.get_context().autocommit_block():
+        # updated_at DESC listings are served by a backward scan
+        op.create_index('ix_conversations_chatbot_uuid_updated_at', 'conversations', ['chatbot_uuid', 'updated_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_conversations_chatbot_uuid_status_updated_at', 'conversations', ['chatbot_uuid', 'status', 'updated_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_conversations_chatbot_uuid_client_uuid_updated_at', 'conversations', ['chatbot_uuid', 'client_uuid', 'updated_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_messages_conversation_uuid_created_at', 'messages', ['conversation_uuid', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_messages_conversation_uuid_created_at_user', 'messages', ['conversation_uuid', 'created_at'], unique=False, postgresql_where=sa.text("role = 'user'"), postgresql_concurrently=True)
+        # Left prefixes of the composites above: dropping them saves a write per insert and updated_at bump
+        op.drop_index('ix_conversations_chatbot_uuid', table_name='conversations', postgresql_concurrently=True)
+        op.drop_index('ix_messages_conversation_uuid', table_name='messages', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Drop the conversation listing indexes."""
+    op.create_index('ix_messages_conversation_uuid', 'messages', ['conversation_uuid'], unique=False)
+    op.create_index('ix_conversations_chatbot_uuid', 'conversations', ['chatbot_uuid'], unique=False)
+    op.drop_index('ix_messages_conversation_uuid_created_at_user', table_name='messages')
+    op.drop_index('ix_messages_conversation_uuid_created_at', table_name='messages')
+    op.drop_index('ix_conversations_chatbot_uuid_client_uuid_updated_at', table_name='conversations')
+    op.drop_index('ix_conversations_chatbot_uuid_status_updated_at', table_name='conversations')
+    op.drop_index('ix_conversations_chatbot_uuid_updated_at', table_name='conversations')
@@ -0,0 +1,36 @@
+"""add_created_at_indexes
+
+Revision ID: created_at_indexes_001
+Revises: workspace_system_001
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'created_at_indexes_001'
+down_revision: Union[str, Sequence[str], None] = 'workspace_system_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index created_at for the admin analytics time-window counts."""
+    # Build the indexes without blocking writes; CONCURRENTLY cannot run
+    # inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_messages_created_at'), 'messages', ['created_at'], unique=False, postgresql_concurrently=True)
+        # client_uuid rides along so the distinct active-client counts are index-only scans
+        op.create_index('ix_conversations_created_at_client_uuid', 'conversations', ['created_at', 'client_uuid'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Drop the created_at indexes."""
+    op.drop_index('ix_conversations_created_at_client_uuid', table_name='conversations')
+    op.drop_index(op.f('ix_messages_created_at'), table_name='messages')
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
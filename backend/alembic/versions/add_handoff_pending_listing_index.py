@@ -0,0 +1,32 @@
+"""add_handoff_pending_listing_index
+
+Revision ID: handoff_pending_listing_001
+Revises: handoff_pending_unique_001
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'handoff_pending_listing_001'
+down_revision: Union[str, Sequence[str], None] = 'handoff_pending_unique_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Serve the pending handoff listing and its keyset order from one index."""
+    with op.get_context().autocommit_block():
+        # Replaces the (chatbot_uuid, status) index, which is a prefix of this one
+        op.create_index('ix_handoff_requests_chatbot_uuid_status_requested_at', 'handoff_requests', ['chatbot_uuid', 'status', 'requested_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_handoff_requests_chatbot_uuid_status', table_name='handoff_requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Restore the (chatbot_uuid, status) handoff request index."""
+    op.create_index('ix_handoff_requests_chatbot_uuid_status', 'handoff_requests', ['chatbot_uuid', 'status'], unique=False)
+    op.drop_index('ix_handoff_requests_chatbot_uuid_status_requested_at', table_name='handoff_requests')
@@ -0,0 +1,46 @@
+"""add_handoff_pending_unique_index
+
+Revision ID: handoff_pending_unique_001
+Revises: conversation_listing_indexes_001
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'handoff_pending_unique_001'
+down_revision: Union[str, Sequence[str], None] = 'conversation_listing_indexes_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Allow at most one pending handoff request per conversation."""
+    # Dedupe and build in one transaction while writes are blocked, so no new
+    # duplicate can appear in between (the table is small; no CONCURRENTLY)
+    op.execute("LOCK TABLE handoff_requests IN SHARE ROW EXCLUSIVE MODE")
+    # Racing creates could leave several pending requests for one conversation:
+    # keep the newest and resolve the others so the unique index can be built
+    op.execute(
+        """
+        UPDATE handoff_requests
+        SET status = 'resolved', resolved_at = now() AT TIME ZONE 'utc'
+        WHERE status = 'pending'
+          AND id NOT IN (
+            SELECT DISTINCT ON (conversation_uuid) id
+            FROM handoff_requests
+            WHERE status = 'pending'
+            ORDER BY conversation_uuid, requested_at DESC, id DESC
+          )
+        """
+    )
+    op.create_index('uq_handoff_requests_conversation_uuid_pending', 'handoff_requests', ['conversation_uuid'], unique=True, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Drop the pending handoff request unique index."""
+    op.drop_index('uq_handoff_requests_conversation_uuid_pending', table_name='handoff_requests')
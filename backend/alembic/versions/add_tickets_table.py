@@ -37,9 +37,9 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.ForeignKeyConstraint(['user_uuid'], ['users.uuid'], ),
         sa.ForeignKeyConstraint(['related_agent_uuid'], ['chatbots.uuid'], ),
+        sa.Index('ix_tickets_user_uuid', 'user_uuid'),
+        sa.Index('ix_tickets_related_agent_uuid', 'related_agent_uuid'),
     )
-    op.create_index('ix_tickets_user_uuid', 'tickets', ['user_uuid'], unique=False)
-    op.create_index('ix_tickets_related_agent_uuid', 'tickets', ['related_agent_uuid'], unique=False)
 
 
 def downgrade() -> None:
@@ -0,0 +1,44 @@
+"""add_topic_question_group_cache
+
+Revision ID: topic_question_group_cache_001
+Revises: topic_question_indexes_001
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'topic_question_group_cache_001'
+down_revision: Union[str, Sequence[str], None] = 'topic_question_indexes_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add topic_question_group_cache table for persisted question groupings."""
+    op.create_table(
+        'topic_question_group_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chatbot_uuid', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('topic', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column('question_limit', sa.Integer(), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('payload', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['chatbot_uuid'], ['chatbots.uuid'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        # One row per chatbot topic; also the upsert conflict target
+        sa.Index('ix_topic_question_group_cache_chatbot_uuid_topic', 'chatbot_uuid', 'topic', unique=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop topic_question_group_cache table."""
+    op.drop_index('ix_topic_question_group_cache_chatbot_uuid_topic', table_name='topic_question_group_cache')
+    op.drop_table('topic_question_group_cache')
@@ -0,0 +1,28 @@
+"""add_topic_question_group_centroids
+
+Revision ID: topic_question_centroids_001
+Revises: topic_question_group_cache_001
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'topic_question_centroids_001'
+down_revision: Union[str, Sequence[str], None] = 'topic_question_group_cache_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store group centroids next to the persisted question groupings."""
+    op.add_column('topic_question_group_cache', sa.Column('centroids', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the group centroids."""
+    op.drop_column('topic_question_group_cache', 'centroids')
@@ -0,0 +1,32 @@
+"""add_topic_question_indexes
+
+Revision ID: topic_question_indexes_001
+Revises: created_at_indexes_001
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'topic_question_indexes_001'
+down_revision: Union[str, Sequence[str], None] = 'created_at_indexes_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index the conversation -> message join behind the topic questions drill-down."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_conversations_chatbot_uuid_uuid', 'conversations', ['chatbot_uuid', 'uuid'], unique=False, postgresql_concurrently=True)
+        # Matches the role/topic filter and serves created_at DESC with a backward scan
+        op.create_index('ix_messages_conversation_uuid_role_topic_created_at', 'messages', ['conversation_uuid', 'role', 'topic', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Drop the topic questions indexes."""
+    op.drop_index('ix_messages_conversation_uuid_role_topic_created_at', table_name='messages')
+    op.drop_index('ix_conversations_chatbot_uuid_uuid', table_name='conversations')
@@ -20,13 +20,14 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # Add window size columns to chatbots table
-    op.add_column('chatbots', sa.Column('window_width', sa.Integer(), nullable=False, server_default='380'))
-    op.add_column('chatbots', sa.Column('window_height', sa.Integer(), nullable=False, server_default='600'))
-    
-    # Add popup message columns to chatbots table
-    op.add_column('chatbots', sa.Column('popup_message_1', sa.String(length=200), nullable=True))
-    op.add_column('chatbots', sa.Column('popup_message_2', sa.String(length=200), nullable=True))
+    # Add window size and popup message columns to chatbots table in a single ALTER TABLE
+    op.execute("""
+        ALTER TABLE chatbots
+            ADD COLUMN window_width INTEGER NOT NULL DEFAULT 380,
+            ADD COLUMN window_height INTEGER NOT NULL DEFAULT 600,
+            ADD COLUMN popup_message_1 VARCHAR(200),
+            ADD COLUMN popup_message_2 VARCHAR(200)
+    """)
 
 
 def downgrade() -> None:
@@ -10,8 +10,6 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 import sqlmodel
-from datetime import datetime, timedelta
-import uuid
 
 
 # revision identifiers, used by Alembic.
@@ -24,6 +22,10 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Add workspace system with user types and workspace management."""
     
+    # Don't wait for WAL flushes while this transaction commits the backfill;
+    # a crash right after commit only means re-running the migration
+    op.execute("SET LOCAL synchronous_commit = OFF")
+    
     # Add max_workspace_users to plans table
     op.add_column('plans', sa.Column('max_workspace_users', sa.Integer(), nullable=False, server_default='1'))
     
@@ -49,13 +51,12 @@ def upgrade() -> None:
         sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
         sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
         sa.Column('owner_uuid', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
         sa.PrimaryKeyConstraint('uuid'),
         sa.ForeignKeyConstraint(['owner_uuid'], ['users.uuid'], ),
+        sa.Index(op.f('ix_workspaces_owner_uuid'), 'owner_uuid'),
     )
-    op.create_index(op.f('ix_workspaces_name'), 'workspaces', ['name'], unique=False)
-    op.create_index(op.f('ix_workspaces_owner_uuid'), 'workspaces', ['owner_uuid'], unique=False)
     
     # Create workspace_members table
     op.create_table('workspace_members',
@@ -63,13 +64,13 @@ def upgrade() -> None:
         sa.Column('workspace_uuid', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=False),
         sa.Column('user_uuid', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=False),
         sa.Column('role', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False, server_default='member'),
-        sa.Column('joined_at', sa.DateTime(), nullable=False),
+        sa.Column('joined_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
         sa.PrimaryKeyConstraint('id'),
         sa.ForeignKeyConstraint(['workspace_uuid'], ['workspaces.uuid'], ),
         sa.ForeignKeyConstraint(['user_uuid'], ['users.uuid'], ),
+        sa.Index(op.f('ix_workspace_members_workspace_uuid'), 'workspace_uuid'),
+        sa.Index(op.f('ix_workspace_members_user_uuid'), 'user_uuid'),
     )
-    op.create_index(op.f('ix_workspace_members_workspace_uuid'), 'workspace_members', ['workspace_uuid'], unique=False)
-    op.create_index(op.f('ix_workspace_members_user_uuid'), 'workspace_members', ['user_uuid'], unique=False)
     
     # Create workspace_invitations table
     op.create_table('workspace_invitations',
@@ -85,75 +86,77 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.ForeignKeyConstraint(['workspace_uuid'], ['workspaces.uuid'], ),
         sa.ForeignKeyConstraint(['invited_by_uuid'], ['users.uuid'], ),
+        sa.Index(op.f('ix_workspace_invitations_workspace_uuid'), 'workspace_uuid'),
+        # At most one pending invitation per email and workspace
+        sa.Index(
+            'uq_workspace_invitations_pending', 'workspace_uuid', 'email',
+            unique=True, postgresql_where=sa.text("status = 'pending'")
+        ),
+        sa.Index(op.f('ix_workspace_invitations_token'), 'token', unique=True),
     )
-    op.create_index(op.f('ix_workspace_invitations_workspace_uuid'), 'workspace_invitations', ['workspace_uuid'], unique=False)
-    op.create_index(op.f('ix_workspace_invitations_email'), 'workspace_invitations', ['email'], unique=False)
-    op.create_index(op.f('ix_workspace_invitations_token'), 'workspace_invitations', ['token'], unique=True)
     
-    # Add workspace_uuid to chatbots table
-    op.add_column('chatbots', sa.Column('workspace_uuid', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=True))
-    op.create_index(op.f('ix_chatbots_workspace_uuid'), 'chatbots', ['workspace_uuid'], unique=False)
+    # Add workspace_uuid to chatbots table as NOT NULL straight away: the empty
+    # server default is a placeholder until the backfill below and avoids a
+    # separate NULL -> NOT NULL pass over chatbots afterwards
+    op.add_column('chatbots', sa.Column('workspace_uuid', sqlmodel.sql.sqltypes.AutoString(length=36), nullable=False, server_default=''))
     
     # Create default workspace for each existing user and migrate their chatbots
     connection = op.get_bind()
     
-    # Get all users
-    users_result = connection.execute(sa.text("SELECT uuid, username FROM users"))
-    users = users_result.fetchall()
-    
-    for user_uuid, username in users:
-        # Create workspace for user
-        workspace_uuid = str(uuid.uuid4())
-        workspace_name = f"{username}'s Workspace"
-        
-        connection.execute(sa.text("""
-            INSERT INTO workspaces (uuid, name, owner_uuid, created_at, updated_at)
-            VALUES (:uuid, :name, :owner_uuid, :created_at, :updated_at)
-        """), {
-            'uuid': workspace_uuid,
-            'name': workspace_name,
-            'owner_uuid': user_uuid,
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
-        })
-        
-        # Add user as workspace owner
-        connection.execute(sa.text("""
-            INSERT INTO workspace_members (workspace_uuid, user_uuid, role, joined_at)
-            VALUES (:workspace_uuid, :user_uuid, 'owner', :joined_at)
-        """), {
-            'workspace_uuid': workspace_uuid,
-            'user_uuid': user_uuid,
-            'joined_at': datetime.utcnow()
-        })
-        
-        # Migrate user's chatbots to workspace
-        connection.execute(sa.text("""
-            UPDATE chatbots
-            SET workspace_uuid = :workspace_uuid
-            WHERE user_uuid = :user_uuid
-        """), {
-            'workspace_uuid': workspace_uuid,
-            'user_uuid': user_uuid
-        })
-    
-    # Make workspace_uuid NOT NULL after migration
-    op.alter_column('chatbots', 'workspace_uuid', nullable=False)
-    op.create_foreign_key('fk_chatbots_workspace_uuid', 'chatbots', 'workspaces', ['workspace_uuid'], ['uuid'])
-    
-    # Update plans to have max_workspace_users
+    # Create one workspace per user server-side; gen_random_uuid() is built
+    # into PostgreSQL 13+, so no user rows round-trip through Python
     connection.execute(sa.text("""
-        UPDATE plans SET max_workspace_users = 1 WHERE name = 'Free' OR name = 'Basic'
+        INSERT INTO workspaces (uuid, name, owner_uuid)
+        SELECT gen_random_uuid()::text, username || '''s Workspace', uuid
+        FROM users
     """))
+    
+    # Add each user as owner of their workspace
     connection.execute(sa.text("""
-        UPDATE plans SET max_workspace_users = 5 WHERE name = 'Starter'
+        INSERT INTO workspace_members (workspace_uuid, user_uuid, role)
+        SELECT uuid, owner_uuid, 'owner' FROM workspaces
     """))
+    
+    # Migrate chatbots to their creator's workspace in one pass
     connection.execute(sa.text("""
-        UPDATE plans SET max_workspace_users = 10 WHERE name = 'Pro'
+        UPDATE chatbots
+        SET workspace_uuid = workspaces.uuid
+        FROM workspaces
+        WHERE workspaces.owner_uuid = chatbots.user_uuid
     """))
+    
+    # Drop the placeholder default; validating the foreign key below fails
+    # on any chatbot the backfill did not assign to a workspace
+    op.alter_column('chatbots', 'workspace_uuid', server_default=None)
+    
+    # Index workspace_uuid only once it is populated, so the backfill UPDATE
+    # doesn't maintain the index row by row
+    op.create_index(op.f('ix_chatbots_workspace_uuid'), 'chatbots', ['workspace_uuid'], unique=False)
+    op.execute("""
+        ALTER TABLE chatbots
+        ADD CONSTRAINT fk_chatbots_workspace_uuid
+        FOREIGN KEY (workspace_uuid) REFERENCES workspaces (uuid) NOT VALID
+    """)
+    
+    # Update plans to have max_workspace_users in a single pass over plans
     connection.execute(sa.text("""
-        UPDATE plans SET max_workspace_users = 50 WHERE name = 'Enterprise'
+        UPDATE plans SET max_workspace_users = CASE name
+            WHEN 'Free' THEN 1
+            WHEN 'Basic' THEN 1
+            WHEN 'Starter' THEN 5
+            WHEN 'Pro' THEN 10
+            WHEN 'Enterprise' THEN 50
+        END
+        WHERE name IN ('Free', 'Basic', 'Starter', 'Pro', 'Enterprise')
     """))
+    
+    # Validate the chatbots foreign key outside the migration transaction so
+    # the scan only holds a SHARE UPDATE EXCLUSIVE lock on chatbots, then
+    # refresh planner statistics for the backfilled tables
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE chatbots VALIDATE CONSTRAINT fk_chatbots_workspace_uuid")
+        for table in ('workspaces', 'workspace_members', 'chatbots'):
+            op.execute(f"ANALYZE {table}")
 
 
 def downgrade() -> None:
@@ -166,7 +169,7 @@ def downgrade() -> None:
     
     # Drop workspace tables
     op.drop_index(op.f('ix_workspace_invitations_token'), table_name='workspace_invitations')
-    op.drop_index(op.f('ix_workspace_invitations_email'), table_name='workspace_invitations')
+    op.drop_index('uq_workspace_invitations_pending', table_name='workspace_invitations')
     op.drop_index(op.f('ix_workspace_invitations_workspace_uuid'), table_name='workspace_invitations')
     op.drop_table('workspace_invitations')
     
@@ -175,7 +178,6 @@ def downgrade() -> None:
     op.drop_table('workspace_members')
     
     op.drop_index(op.f('ix_workspaces_owner_uuid'), table_name='workspaces')
-    op.drop_index(op.f('ix_workspaces_name'), table_name='workspaces')
     op.drop_table('workspaces')
     
     # Revert user credits fields to non-nullable
@@ -39,22 +39,17 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.ForeignKeyConstraint(['chatbot_uuid'], ['chatbots.uuid'], ),
         sa.ForeignKeyConstraint(['user_uuid'], ['users.uuid'], ),
+        sa.Index('ix_background_tasks_task_id', 'task_id', unique=True),
+        # Latest task lookup for a resource filters on all three columns
+        sa.Index('ix_background_tasks_chatbot_resource', 'chatbot_uuid', 'resource_type', 'resource_id'),
+        sa.Index('ix_background_tasks_user_uuid', 'user_uuid'),
     )
-    op.create_index('ix_background_tasks_task_id', 'background_tasks', ['task_id'], unique=True)
-    op.create_index('ix_background_tasks_task_type', 'background_tasks', ['task_type'], unique=False)
-    op.create_index('ix_background_tasks_status', 'background_tasks', ['status'], unique=False)
-    op.create_index('ix_background_tasks_resource_id', 'background_tasks', ['resource_id'], unique=False)
-    op.create_index('ix_background_tasks_chatbot_uuid', 'background_tasks', ['chatbot_uuid'], unique=False)
-    op.create_index('ix_background_tasks_user_uuid', 'background_tasks', ['user_uuid'], unique=False)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     op.drop_index('ix_background_tasks_user_uuid', table_name='background_tasks')
-    op.drop_index('ix_background_tasks_chatbot_uuid', table_name='background_tasks')
-    op.drop_index('ix_background_tasks_resource_id', table_name='background_tasks')
-    op.drop_index('ix_background_tasks_status', table_name='background_tasks')
-    op.drop_index('ix_background_tasks_task_type', table_name='background_tasks')
+    op.drop_index('ix_background_tasks_chatbot_resource', table_name='background_tasks')
     op.drop_index('ix_background_tasks_task_id', table_name='background_tasks')
     op.drop_table('background_tasks')
 
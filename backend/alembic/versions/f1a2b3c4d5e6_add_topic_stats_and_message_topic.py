@@ -50,18 +50,17 @@ def upgrade() -> None:
         sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
         sa.ForeignKeyConstraint(["chatbot_uuid"], ["chatbots.uuid"]),
         sa.PrimaryKeyConstraint("id"),
+        # Serves both the per-chatbot listing and the (chatbot, topic) upsert lookup
+        sa.Index("ix_topic_stats_chatbot_uuid_topic", "chatbot_uuid", "topic"),
+        sa.Index("ix_topic_stats_topic", "topic"),
     )
-    op.create_index(
-        "ix_topic_stats_chatbot_uuid", "topic_stats", ["chatbot_uuid"], unique=False
-    )
-    op.create_index("ix_topic_stats_topic", "topic_stats", ["topic"], unique=False)
 
 
 def downgrade() -> None:
     """Rollback topic analytics schema."""
     # Drop topic_stats table
     op.drop_index("ix_topic_stats_topic", table_name="topic_stats")
-    op.drop_index("ix_topic_stats_chatbot_uuid", table_name="topic_stats")
+    op.drop_index("ix_topic_stats_chatbot_uuid_topic", table_name="topic_stats")
     op.drop_table("topic_stats")
 
     # Drop topic column from messages
@@ -1,148 +1,165 @@
 from typing import List
 from fastapi import APIRouter, Depends, status, HTTPException
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session, get_async_session
 from app.models import User
 from app.schemas import UserCreate, UserResponse, LoginRequest, TokenResponse, UserUpdate, ChangePasswordRequest
-from app.auth import get_current_user, hash_password, verify_password
+from app.auth import get_current_user, hash_password_async, verify_password_async
 from app.services.auth_service import AuthService
+from app.services.cache_service import cache_service
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, session: Session = Depends(get_session)):
+async def register(user_data: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """Register a new user account"""
-    return AuthService.register_user(user_data, session)
+    return await AuthService.register_user(user_data, session)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(login_data: LoginRequest, session: Session = Depends(get_session)):
+async def login(login_data: LoginRequest, session: AsyncSession = Depends(get_async_session)):
     """Authenticate user and return JWT token"""
-    return AuthService.authenticate_user(login_data, session)
+    return await AuthService.authenticate_user(login_data, session)
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me")
 def get_me(
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
-):
+) -> UserResponse:
     """Get current authenticated user information.
     
     For users without plans (invited users), returns credits from workspaces
     they're members of (from the owner's plan).
     """
+    from datetime import datetime
+    from sqlalchemy.orm import aliased
     from app.models import WorkspaceMember, Workspace
     from app.services.credits_service import credits_service
     
     # If user has a plan, return as-is
     if current_user.plan_id:
-        return current_user
+        return UserResponse.model_validate(current_user)
     
-    # For users without plans, get credits from workspaces they're members of
-    # Use the first workspace they're a member of (or the one with most credits)
-    member_workspaces = session.exec(
-        select(Workspace)
-        .join(WorkspaceMember)
+    # For users without plans, get credits from a workspace they're a member of:
+    # workspace and owner credits come back in a single row
+    owner = aliased(User)
+    membership = session.exec(
+        select(Workspace.uuid, owner.plan_id, owner.message_credits_remaining, owner.credits_reset_date)
+        .join(WorkspaceMember, WorkspaceMember.workspace_uuid == Workspace.uuid)
+        .join(owner, owner.uuid == Workspace.owner_uuid)
         .where(WorkspaceMember.user_uuid == current_user.uuid)
-    ).all()
+        .limit(1)
+    ).first()
     
-    if member_workspaces:
-        # Get credits from the first workspace (owner's credits)
-        workspace = member_workspaces[0]
-        credits_info = credits_service.get_workspace_credits_info(workspace.uuid, session)
+    if membership:
+        workspace_uuid, owner_plan_id, credits_remaining, credits_reset_date = membership
+        
+        # Owner's monthly renewal is due: let the credits service reset it first
+        if owner_plan_id and credits_remaining is not None and credits_reset_date and datetime.utcnow() >= credits_reset_date:
+            credits_info = credits_service.get_workspace_credits_info(workspace_uuid, session)
+            credits_remaining = credits_info["credits_remaining"]
+            credits_reset_date = credits_info["credits_reset_date"]
         
-        # Create a response with workspace owner's credits info
+        # Fields come straight from the ORM row, so skip re-validation
         # Note: We're not modifying the user object, just the response
-        user_dict = {
-            "uuid": current_user.uuid,
-            "username": current_user.username,
-            "email": current_user.email,
-            "is_active": current_user.is_active,
-            "plan_id": None,  # User doesn't have a plan
-            "message_credits_remaining": credits_info["credits_remaining"],
-            "credits_reset_date": credits_info["credits_reset_date"],
-            "subscription_status": current_user.subscription_status,
-            "user_type": current_user.user_type,
-            "created_at": current_user.created_at
-        }
-        return UserResponse(**user_dict)
+        return UserResponse.model_construct(
+            uuid=current_user.uuid,
+            username=current_user.username,
+            email=current_user.email,
+            is_active=current_user.is_active,
+            plan_id=None,  # User doesn't have a plan
+            message_credits_remaining=credits_remaining or 0,
+            credits_reset_date=credits_reset_date,
+            subscription_status=current_user.subscription_status,
+            user_type=current_user.user_type,
+            created_at=current_user.created_at
+        )
     
     # No workspaces, return user as-is (all None for credits)
-    return current_user
+    return UserResponse.model_validate(current_user)
 
 
-@router.get("/user/{user_uuid}", response_model=UserResponse)
-def get_user_by_uuid(
+@router.get("/user/{user_uuid}")
+async def get_user_by_uuid(
     user_uuid: str,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
-):
+    session: AsyncSession = Depends(get_async_session)
+) -> UserResponse:
     """Get user information by UUID (for displaying assigned agents)"""
-    user = session.get(User, user_uuid)
+    user = await session.get(User, user_uuid)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     # Only return basic info (username, email) - no sensitive data
-    return user
+    return UserResponse.model_validate(user)
 
 
-@router.patch("/me", response_model=UserResponse)
-def update_profile(
+@router.patch("/me")
+async def update_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
-):
+    session: AsyncSession = Depends(get_async_session)
+) -> UserResponse:
     """Update user profile (username and/or email)"""
-    
-    # Check if username is being changed and if it's already taken
+    values = {}
     if user_update.username and user_update.username != current_user.username:
-        existing_user = session.exec(
-            select(User).where(User.username == user_update.username)
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        current_user.username = user_update.username
-    
-    # Check if email is being changed and if it's already taken
+        values["username"] = user_update.username
     if user_update.email and user_update.email != current_user.email:
-        existing_user = session.exec(
-            select(User).where(User.email == user_update.email)
-        ).first()
-        if existing_user:
+        values["email"] = user_update.email
+    
+    # The response row comes from this async session: current_user may only have the
+    # cached identity columns loaded, and reading the others would query synchronously
+    if values:
+        # The unique indexes on username/email reject duplicates, no pre-check queries needed
+        try:
+            user = (await session.exec(
+                update(User).where(User.uuid == current_user.uuid).values(**values).returning(User)
+            )).scalars().one()
+            await session.commit()
+            cache_service.invalidate_auth_user(current_user.uuid)
+        except IntegrityError as e:
+            await session.rollback()
+            field = "Email" if "ix_users_email" in str(e.orig) else "Username"
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already taken"
+                detail=f"{field} already taken"
             )
-        current_user.email = user_update.email
-    
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+    else:
+        user = await session.get(User, current_user.uuid)
     
-    return current_user
+    return UserResponse.model_validate(user)
 
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_data: ChangePasswordRequest,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Change user password"""
     
+    # The password hash is not cached on current_user: load it on this async session
+    hashed_password = (await session.exec(
+        select(User.hashed_password).where(User.uuid == current_user.uuid)
+    )).one()
+    
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
     # Hash and update password
-    current_user.hashed_password = hash_password(password_data.new_password)
-    session.add(current_user)
-    session.commit()
+    await session.exec(
+        update(User)
+        .where(User.uuid == current_user.uuid)
+        .values(hashed_password=await hash_password_async(password_data.new_password))
+    )
+    await session.commit()
+    cache_service.invalidate_auth_user(current_user.uuid)
     
     return {"message": "Password changed successfully"}
\ No newline at end of file
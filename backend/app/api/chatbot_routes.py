@@ -1,18 +1,36 @@
 from typing import List, Optional
 from fastapi import Query
 from fastapi import APIRouter, Depends, status, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from sqlmodel import Session, select
-from app.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session, get_async_session
 from app.models import User, Chatbot
 from app.schemas import ChatbotCreate, ChatbotUpdate, ChatbotResponse
 from app.auth import get_current_user
 from app.services.chatbot_service import ChatbotService
+from app.services.cache_service import cache_service
+from app.api.document_routes import router as document_router
 from pydantic import BaseModel
+import orjson
 import os
 
 router = APIRouter(prefix="/chatbots", tags=["Chatbots"])
 
+# Public API URL used in widget embed codes
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+
+# Widget config changes rarely: let browsers/CDNs reuse it and revalidate with the ETag
+PUBLIC_CHATBOT_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+# Widget embed snippet; API_URL is resolved once at import, only the chatbot UUID varies
+EMBED_TEMPLATE = f'''<script 
+  src="{API_URL}/widget.js" 
+  data-chatbot-uuid="{{uuid}}" 
+  data-api-url="{API_URL}"
+  async>
+</script>'''
+
 
 @router.post("", response_model=ChatbotResponse, status_code=status.HTTP_201_CREATED)
 def create_chatbot(
@@ -52,7 +70,9 @@ def update_chatbot(
     session: Session = Depends(get_session)
 ):
     """Update a chatbot"""
-    return ChatbotService.update_chatbot(chatbot_uuid, chatbot_update, current_user.uuid, session)
+    chatbot = ChatbotService.update_chatbot(chatbot_uuid, chatbot_update, current_user.uuid, session)
+    cache_service.invalidate_chatbot(chatbot_uuid)
+    return chatbot
 
 
 @router.delete("/{chatbot_uuid}", status_code=status.HTTP_204_NO_CONTENT)
@@ -63,6 +83,7 @@ def delete_chatbot(
 ):
     """Delete a chatbot"""
     ChatbotService.delete_chatbot(chatbot_uuid, current_user.uuid, session)
+    cache_service.invalidate_chatbot(chatbot_uuid)
     return None
 
 
@@ -87,21 +108,8 @@ def get_embed_code(
             detail="Cannot generate embed code for inactive chatbot"
         )
     
-    # Get API URL from environment or use default
-    api_url = os.getenv("API_URL", "http://localhost:8000")
-    # Remove protocol for WebSocket URL construction
-    api_url_clean = api_url.replace("https://", "").replace("http://", "")
-    
-    # Generate embed code
-    embed_code = f'''<script 
-  src="{api_url}/widget.js" 
-  data-chatbot-uuid="{chatbot.uuid}" 
-  data-api-url="{api_url}"
-  async>
-</script>'''
-    
     return EmbedCodeResponse(
-        embed_code=embed_code,
+        embed_code=EMBED_TEMPLATE.format(uuid=chatbot.uuid),
         chatbot_uuid=chatbot.uuid,
         chatbot_name=chatbot.name
     )
@@ -133,56 +141,39 @@ class PublicChatbotInfo(BaseModel):
         from_attributes = True
 
 
+def _public_chatbot_response(request: Request, body: bytes, etag: str) -> Response:
+    """Return the widget payload, or 304 when the client already has this version."""
+    headers = {"ETag": etag, "Cache-Control": PUBLIC_CHATBOT_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in client_etags or "*" in client_etags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/{chatbot_uuid}/public")
-def get_public_chatbot_info(
+async def get_public_chatbot_info(
     chatbot_uuid: str,
-    session: Session = Depends(get_session)
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Get public information about a chatbot (for widget) - allows CORS from any origin"""
-    chatbot = session.exec(
-        select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
-    ).first()
+    """Get public information about a chatbot (for widget) - CORS for any origin is handled by PublicCORSMiddleware"""
+    cached = await cache_service.get_public_chatbot(chatbot_uuid)
+    if cached is not None:
+        return _public_chatbot_response(request, *cached)
+    
+    chatbot = await session.get(Chatbot, chatbot_uuid)
     
     if not chatbot:
-        return JSONResponse(
-            status_code=404,
-            content={"detail": "Chatbot not found"},
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-            }
-        )
+        raise HTTPException(status_code=404, detail="Chatbot not found")
     
-    # Return with CORS headers to allow widget embedding from any origin
-    response_data = PublicChatbotInfo(
-        uuid=chatbot.uuid,
-        name=chatbot.name,
-        is_active=chatbot.is_active,
-        color_primary=chatbot.color_primary,
-        color_user_message=chatbot.color_user_message,
-        color_bot_message=chatbot.color_bot_message,
-        color_background=chatbot.color_background,
-        border_radius_chatbot=chatbot.border_radius_chatbot,
-        border_radius_messages=chatbot.border_radius_messages,
-        border_radius_input=chatbot.border_radius_input,
-        color_primary_dark=chatbot.color_primary_dark,
-        color_user_message_dark=chatbot.color_user_message_dark,
-        color_bot_message_dark=chatbot.color_bot_message_dark,
-        color_background_dark=chatbot.color_background_dark,
-        welcome_message=chatbot.welcome_message,
-        example_messages=chatbot.example_messages,
-        window_width=chatbot.window_width,
-        window_height=chatbot.window_height,
-        popup_message_1=chatbot.popup_message_1,
-        popup_message_2=chatbot.popup_message_2
-    )
+    # from_attributes lets pydantic-core read the ORM fields directly
+    response_data = PublicChatbotInfo.model_validate(chatbot)
     
-    return JSONResponse(
-        content=response_data.model_dump(),
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    body, etag = await cache_service.set_public_chatbot(chatbot_uuid, orjson.dumps(response_data.model_dump()))
+    return _public_chatbot_response(request, body, etag)
+
+
+# Document endpoints live under /chatbots/{chatbot_uuid}/documents
+router.include_router(document_router)
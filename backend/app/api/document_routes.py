@@ -7,7 +7,8 @@ from app.schemas import DocumentResponse
 from app.auth import get_current_user
 from app.services.document_service import DocumentService
 
-router = APIRouter(prefix="/chatbots", tags=["Documents"])
+# Mounted under the chatbots router (/chatbots)
+router = APIRouter(tags=["Documents"])
 
 
 @router.post("/{chatbot_uuid}/documents", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
@@ -1,21 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from app.database import get_session
+from app.database import get_session, get_async_session
 from app.models import Plan, User
 from app.schemas import PlanResponse
 from app.auth import get_current_user
 from app.services.credits_service import credits_service
+from app.services.cache_service import cache_service
 
 router = APIRouter(prefix="/api", tags=["plans"])
 
 
-@router.get("/plans", response_model=List[PlanResponse])
-def get_plans(
-    session: Session = Depends(get_session)
-):
+@router.get("/plans")
+async def get_plans(
+    session: AsyncSession = Depends(get_async_session)
+) -> List[PlanResponse]:
     """Get all available plans"""
-    plans = session.exec(select(Plan).where(Plan.is_active == True)).all()
+    # Cached as response models, so a hit returns them without touching the ORM rows
+    plans = cache_service.get_plans("active")
+    if plans is None:
+        rows = (await session.exec(select(Plan).where(Plan.is_active == True))).all()
+        plans = [PlanResponse.model_validate(plan) for plan in rows]
+        cache_service.set_plans("active", plans)
     return plans
 
 
@@ -29,28 +36,35 @@ def get_user_credits(
 
 
 @router.post("/user/upgrade-plan")
-def upgrade_plan(
+async def upgrade_plan(
     plan_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """Upgrade user to a different plan"""
-    plan = session.exec(select(Plan).where(Plan.id == plan_id)).first()
+    plan = cache_service.get_plans(plan_id)
+    if plan is None:
+        plan = (await session.exec(select(Plan).where(Plan.id == plan_id))).first()
+        if plan:
+            cache_service.set_plans(plan_id, plan)
     
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     
     # Update user's plan
-    current_user.plan_id = plan_id
-    current_user.message_credits_remaining = plan.message_credits
-    current_user.subscription_status = "active"
-    
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+    await session.exec(
+        update(User)
+        .where(User.uuid == current_user.uuid)
+        .values(
+            plan_id=plan_id,
+            message_credits_remaining=plan.message_credits,
+            subscription_status="active"
+        )
+    )
+    await session.commit()
     
     return {
         "message": f"Successfully upgraded to {plan.display_name}",
-        "credits_remaining": current_user.message_credits_remaining
+        "credits_remaining": plan.message_credits
     }
 
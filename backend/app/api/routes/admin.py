@@ -2,15 +2,19 @@
 Admin API routes for super admin dashboard.
 Only accessible to users with user_type='admin'
 """
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
+from fastapi.responses import ORJSONResponse
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 from app.models import User, Chatbot, Workspace, Conversation, Message, Ticket
 from app.auth import get_current_user
-from app.database import get_session
+from app.database import fetch_all, fetch_one, get_async_session
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -47,8 +51,7 @@ class AdminAnalyticsResponse(BaseModel):
 
 
 @router.get("/analytics", response_model=AdminAnalyticsResponse)
-def get_admin_analytics(
-    session: Session = Depends(get_session),
+async def get_admin_analytics(
     admin_user: User = Depends(require_admin)
 ):
     """Get comprehensive analytics for admin dashboard"""
@@ -59,92 +62,68 @@ def get_admin_analytics(
     month_ago = now - timedelta(days=30)
     day_ago = now - timedelta(days=1)
     
-    # Total counts
-    total_users = session.exec(select(func.count(User.uuid))).one()
-    total_workspaces = session.exec(select(func.count(Workspace.uuid))).one()
-    total_chatbots = session.exec(select(func.count(Chatbot.uuid))).one()
-    total_conversations = session.exec(select(func.count(Conversation.uuid))).one()
-    total_messages = session.exec(select(func.count(Message.id))).one()
-    
-    # Active users (users who have created conversations in the time period)
-    active_users_24h = session.exec(
-        select(func.count(func.distinct(Conversation.client_uuid)))
-        .where(Conversation.created_at >= day_ago)
-    ).one() or 0
-    
-    active_users_7d = session.exec(
-        select(func.count(func.distinct(Conversation.client_uuid)))
-        .where(Conversation.created_at >= week_ago)
-    ).one() or 0
-    
-    active_users_30d = session.exec(
-        select(func.count(func.distinct(Conversation.client_uuid)))
-        .where(Conversation.created_at >= month_ago)
-    ).one() or 0
-    
-    # New users
-    new_users_today = session.exec(
-        select(func.count(User.uuid))
-        .where(User.created_at >= today_start)
-    ).one() or 0
-    
-    new_users_7d = session.exec(
-        select(func.count(User.uuid))
-        .where(User.created_at >= week_ago)
-    ).one() or 0
-    
-    new_users_30d = session.exec(
-        select(func.count(User.uuid))
-        .where(User.created_at >= month_ago)
-    ).one() or 0
+    # One scan per table: each time window is a FILTER aggregate on the same row
+    users_query = select(
+        func.count(),
+        func.count().filter(User.created_at >= today_start),
+        func.count().filter(User.created_at >= week_ago),
+        func.count().filter(User.created_at >= month_ago),
+    ).select_from(User)
+    
+    conversations_query = select(
+        func.count(),
+        func.count().filter(Conversation.created_at >= today_start),
+        func.count().filter(Conversation.created_at >= week_ago),
+        func.count().filter(Conversation.created_at >= month_ago),
+        # Active users (distinct clients who started conversations in the period)
+        func.count(func.distinct(Conversation.client_uuid)).filter(Conversation.created_at >= day_ago),
+        func.count(func.distinct(Conversation.client_uuid)).filter(Conversation.created_at >= week_ago),
+        func.count(func.distinct(Conversation.client_uuid)).filter(Conversation.created_at >= month_ago),
+    ).select_from(Conversation)
+    
+    messages_query = select(
+        func.count(),
+        func.count().filter(Message.created_at >= today_start),
+        func.count().filter(Message.created_at >= week_ago),
+        func.count().filter(Message.created_at >= month_ago),
+    ).select_from(Message)
+    
+    totals_query = select(
+        select(func.count(Workspace.uuid)).scalar_subquery(),
+        select(func.count(Chatbot.uuid)).scalar_subquery(),
+    )
     
     # Users by type
-    users_by_type = {}
-    for user_type in ["admin", "normal", "customer_service"]:
-        count = session.exec(
-            select(func.count(User.uuid))
-            .where(User.user_type == user_type)
-        ).one() or 0
-        users_by_type[user_type] = count
-    
-    # Conversations
-    conversations_today = session.exec(
-        select(func.count(Conversation.uuid))
-        .where(Conversation.created_at >= today_start)
-    ).one() or 0
-    
-    conversations_7d = session.exec(
-        select(func.count(Conversation.uuid))
-        .where(Conversation.created_at >= week_ago)
-    ).one() or 0
-    
-    conversations_30d = session.exec(
-        select(func.count(Conversation.uuid))
-        .where(Conversation.created_at >= month_ago)
-    ).one() or 0
-    
-    # Messages
-    messages_today = session.exec(
-        select(func.count(Message.id))
-        .where(Message.created_at >= today_start)
-    ).one() or 0
+    users_by_type = {"admin": 0, "normal": 0, "customer_service": 0}
+    users_by_type_query = (
+        select(User.user_type, func.count(User.uuid))
+        .where(User.user_type.in_(list(users_by_type)))
+        .group_by(User.user_type)
+    )
     
-    messages_7d = session.exec(
-        select(func.count(Message.id))
-        .where(Message.created_at >= week_ago)
-    ).one() or 0
+    # The statements are independent: run them concurrently on separate pooled connections
+    users, conversations, messages, (total_workspaces, total_chatbots), type_counts = await asyncio.gather(
+        fetch_one(users_query),
+        fetch_one(conversations_query),
+        fetch_one(messages_query),
+        fetch_one(totals_query),
+        fetch_all(users_by_type_query),
+    )
+    users_by_type.update(dict(type_counts))
     
-    messages_30d = session.exec(
-        select(func.count(Message.id))
-        .where(Message.created_at >= month_ago)
-    ).one() or 0
+    total_users, new_users_today, new_users_7d, new_users_30d = users
+    (
+        total_conversations, conversations_today, conversations_7d, conversations_30d,
+        active_users_24h, active_users_7d, active_users_30d,
+    ) = conversations
+    total_messages, messages_today, messages_7d, messages_30d = messages
     
     return AdminAnalyticsResponse(
-        total_users=total_users or 0,
-        total_workspaces=total_workspaces or 0,
-        total_chatbots=total_chatbots or 0,
-        total_conversations=total_conversations or 0,
-        total_messages=total_messages or 0,
+        total_users=total_users,
+        total_workspaces=total_workspaces,
+        total_chatbots=total_chatbots,
+        total_conversations=total_conversations,
+        total_messages=total_messages,
         active_users_24h=active_users_24h,
         active_users_7d=active_users_7d,
         active_users_30d=active_users_30d,
@@ -181,41 +160,27 @@ class TicketResponse(BaseModel):
         from_attributes = True
 
 
-@router.get("/tickets", response_model=List[TicketResponse])
-def get_all_tickets(
-    session: Session = Depends(get_session),
+@router.get(
+    "/tickets",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[TicketResponse]}},
+)
+async def get_all_tickets(
+    session: AsyncSession = Depends(get_async_session),
     admin_user: User = Depends(require_admin)
 ):
     """Get all support tickets (admin only)"""
-    tickets = session.exec(
-        select(Ticket)
+    # Enrich with user and chatbot names in the same query; rows are serialized
+    # straight to JSON by orjson without building a model per ticket
+    rows = (await session.exec(
+        select(
+            *Ticket.__table__.columns,
+            User.username,
+            Chatbot.name.label("chatbot_name"),
+        )
+        .outerjoin(User, User.uuid == Ticket.user_uuid)
+        .outerjoin(Chatbot, Chatbot.uuid == Ticket.related_agent_uuid)
         .order_by(Ticket.created_at.desc())
-    ).all()
+    )).all()
     
-    # Enrich with user and chatbot names
-    result = []
-    for ticket in tickets:
-        user = session.get(User, ticket.user_uuid)
-        chatbot = None
-        if ticket.related_agent_uuid:
-            chatbot = session.get(Chatbot, ticket.related_agent_uuid)
-        
-        result.append(TicketResponse(
-            id=ticket.id,
-            user_uuid=ticket.user_uuid,
-            email=ticket.email,
-            related_account=ticket.related_account,
-            related_agent_uuid=ticket.related_agent_uuid,
-            problem_type=ticket.problem_type,
-            severity=ticket.severity,
-            subject=ticket.subject,
-            description=ticket.description,
-            status=ticket.status,
-            created_at=ticket.created_at,
-            updated_at=ticket.updated_at,
-            username=user.username if user else None,
-            chatbot_name=chatbot.name if chatbot else None
-        ))
-    
-    return result
-
+    return ORJSONResponse([dict(row._mapping) for row in rows])
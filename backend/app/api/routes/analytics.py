@@ -1,22 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select, func
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timezone
+import asyncio
 import os
+from functools import lru_cache
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
-from app.database import get_session
-from app.models import TopicStat, Chatbot, Message, Conversation
+from app.database import AsyncSessionLocal, fetch_all, fetch_first, fetch_one
+from app.models import TopicStat, TopicQuestionGroupCache, Chatbot, Message, Conversation
+from app.services.cache_service import cache_service
 from pydantic import BaseModel
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1024
+# Texts per embeddings request, and how many requests may be in flight at once
+EMBEDDING_BATCH_SIZE = 1024
+EMBEDDING_CONCURRENCY = 5
+# Optional local model for grouping (e.g. "sentence-transformers/all-MiniLM-L6-v2"),
+# run with fastembed instead of calling OpenAI
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL")
+# Most recent questions grouped per request; grouping is quadratic in this number
+TOPIC_QUESTIONS_MAX = int(os.getenv("TOPIC_QUESTIONS_MAX", "2000"))
+# Minimum cosine similarity for two questions to share a group
+QUESTION_SIMILARITY_THRESHOLD = 0.82
+# Rows of the similarity matrix computed per matmul; small blocks keep the working
+# set cache-sized and the full N x N matrix is never materialized
+SIMILARITY_BLOCK_ROWS = 256
 
-def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
-  """Compute cosine similarity between two arrays."""
-  # Normalize vectors
-  a_norm = a / (np.linalg.norm(a, axis=1, keepdims=True) + 1e-8)
-  b_norm = b / (np.linalg.norm(b, axis=1, keepdims=True) + 1e-8)
-  # Compute dot product
-  return np.dot(a_norm, b_norm.T)
+
+def _cosine_similarity(a: np.ndarray, b: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+  """Compute cosine similarity between two arrays of L2-normalized rows."""
+  # Rows are already unit length, so cosine similarity is the dot product
+  return np.dot(a, b.T, out=out)
 
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
@@ -36,23 +56,31 @@ class ChatbotTopicsResponse(BaseModel):
 
 
 @router.get("/chatbots/{chatbot_uuid}/topics", response_model=ChatbotTopicsResponse)
-def get_chatbot_topics(
+async def get_chatbot_topics(
   chatbot_uuid: str,
-  session: Session = Depends(get_session),
 ):
   """Return aggregated topic analytics for a chatbot."""
 
+  # Totals come back on every row as window aggregates, already sorted by count;
+  # the existence check runs alongside on its own connection
+  chatbot, stats = await asyncio.gather(
+    fetch_first(select(Chatbot.uuid).where(Chatbot.uuid == chatbot_uuid)),
+    fetch_all(
+      select(
+        TopicStat.topic,
+        TopicStat.message_count,
+        func.sum(TopicStat.message_count).over(),
+        func.max(TopicStat.updated_at).over(),
+      )
+      .where(TopicStat.chatbot_uuid == chatbot_uuid)
+      .order_by(TopicStat.message_count.desc())
+    ),
+  )
+
   # Ensure chatbot exists
-  chatbot = session.exec(
-    select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
-  ).first()
   if not chatbot:
     raise HTTPException(status_code=404, detail="Chatbot not found")
 
-  stats = session.exec(
-    select(TopicStat).where(TopicStat.chatbot_uuid == chatbot_uuid)
-  ).all()
-
   if not stats:
     return ChatbotTopicsResponse(
       chatbot_uuid=chatbot_uuid,
@@ -61,21 +89,19 @@ def get_chatbot_topics(
       updated_at=datetime.now(timezone.utc),
     )
 
-  total = sum(s.message_count for s in stats)
+  _, _, total, latest_updated_at = stats[0]
   if total == 0:
     topics: List[TopicItem] = []
   else:
     topics = [
       TopicItem(
-        label=s.topic,
-        count=s.message_count,
-        percentage=round((s.message_count / total) * 100, 2),
+        label=topic,
+        count=message_count,
+        percentage=round((message_count / total) * 100, 2),
       )
-      for s in sorted(stats, key=lambda x: x.message_count, reverse=True)
+      for topic, message_count, _, _ in stats
     ]
 
-  latest_updated_at = max(s.updated_at for s in stats if s.updated_at)
-
   return ChatbotTopicsResponse(
     chatbot_uuid=chatbot_uuid,
     topics=topics,
@@ -91,35 +117,172 @@ class QuestionGroup(BaseModel):
 
 
 class TopicQuestionsResponse(BaseModel):
+  """Grouped questions from one page of a topic's user messages, newest first.
+  
+  A page holds at most TOPIC_QUESTIONS_MAX questions; total_questions counts the
+  questions in this page and has_more tells whether older ones remain.
+  """
   topic: str
   question_groups: List[QuestionGroup]
   total_questions: int
+  has_more: bool = False
+
+
+@lru_cache(maxsize=1)
+def _get_local_embedding_model():
+  """Load the local embedding model once per worker (fastembed is an optional dependency)."""
+  from fastembed import TextEmbedding
+  return TextEmbedding(LOCAL_EMBEDDING_MODEL)
+
+
+def _embed_locally(texts: List[str]) -> List[np.ndarray]:
+  """Embed texts on this machine with the local ONNX model."""
+  return list(_get_local_embedding_model().embed(texts))
+
+
+@lru_cache(maxsize=1)
+def _get_openai_embeddings():
+  """Build the OpenAI embeddings client once per worker so its HTTP connections are reused."""
+  from langchain_openai import OpenAIEmbeddings
+  
+  openai_api_key = os.getenv("OPENAI_API_KEY")
+  if not openai_api_key:
+    raise ValueError("OPENAI_API_KEY not set")
+  
+  return OpenAIEmbeddings(
+    model=EMBEDDING_MODEL,
+    dimensions=EMBEDDING_DIMENSIONS,
+    openai_api_key=openai_api_key,
+    chunk_size=EMBEDDING_BATCH_SIZE
+  )
+
+
+async def _embed_with_openai(texts: List[str]) -> List[List[float]]:
+  """Embed texts with OpenAI, sending the batches concurrently."""
+  embeddings_model = _get_openai_embeddings()
+  
+  # aembed_documents awaits its own chunks one after another, so split here
+  # and let the batches run in parallel
+  semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+  
+  async def embed_batch(batch: List[str]) -> List[List[float]]:
+    async with semaphore:
+      return await embeddings_model.aembed_documents(batch)
+  
+  batches = await asyncio.gather(*(
+    embed_batch(texts[i:i + EMBEDDING_BATCH_SIZE])
+    for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+  ))
+  return [embedding for batch in batches for embedding in batch]
 
 
-def _get_embeddings_for_texts(texts: List[str]) -> List[List[float]]:
-  """Get embeddings for a list of texts using OpenAI."""
+async def _get_embeddings_for_texts(texts: List[str]) -> List[List[float]]:
+  """Get embeddings for a list of texts, locally when LOCAL_EMBEDDING_MODEL is set, else from OpenAI."""
   try:
-    from langchain_openai import OpenAIEmbeddings
-    
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not openai_api_key:
-      raise ValueError("OPENAI_API_KEY not set")
-    
-    embeddings_model = OpenAIEmbeddings(
-      model="text-embedding-3-small",
-      dimensions=1024,
-      openai_api_key=openai_api_key
-    )
-    
-    # Get embeddings for all texts
-    embeddings = embeddings_model.embed_documents(texts)
-    return embeddings
+    if LOCAL_EMBEDDING_MODEL:
+      # Inference is CPU-bound, keep it off the event loop
+      return await asyncio.to_thread(_embed_locally, texts)
+    return await _embed_with_openai(texts)
   except Exception as e:
     print(f"[Analytics] Error getting embeddings: {e}")
     raise
 
 
-def _group_similar_questions(questions: List[str], similarity_threshold: float = 0.85) -> List[QuestionGroup]:
+def _quantize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+  """Quantize embeddings to int8, scaling each row so its largest component maps to 127.
+  
+  The per-row scale is dropped: rows are L2-normalized before comparing, so cosine
+  similarity does not depend on it.
+  """
+  peaks = np.abs(embeddings).max(axis=1, keepdims=True)
+  peaks[peaks == 0] = 1
+  return np.round(embeddings * (127 / peaks)).astype(np.int8)
+
+
+async def _get_cached_embeddings(texts: List[str]) -> np.ndarray:
+  """Get float32 embeddings for texts, embedding only the texts not cached yet.
+  
+  Vectors are cached and compared in their int8 form, a quarter of the float32 size;
+  the rounding error is far below what the similarity threshold can distinguish.
+  """
+  cache_model = f"{LOCAL_EMBEDDING_MODEL or f'{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}'}:int8"
+  cached = await cache_service.get_embeddings(cache_model, texts)
+  
+  rows: List[Optional[np.ndarray]] = [
+    None if vector is None else np.frombuffer(vector, dtype=np.int8)
+    for vector in cached
+  ]
+  missing = [i for i, row in enumerate(rows) if row is None]
+  
+  if missing:
+    fresh = _quantize_embeddings(
+      np.asarray(await _get_embeddings_for_texts([texts[i] for i in missing]), dtype=np.float32)
+    )
+    for i, vector in zip(missing, fresh):
+      rows[i] = vector
+    await cache_service.set_embeddings(
+      cache_model,
+      {texts[i]: vector.tobytes() for i, vector in zip(missing, fresh)}
+    )
+  
+  # Compare in float32: numpy's integer matmul bypasses BLAS and would be far slower,
+  # and float32 keeps the matmul on single-precision BLAS
+  return np.stack(rows).astype(np.float32)
+
+
+def _dedupe_questions(questions: List[str]) -> Tuple[List[str], np.ndarray]:
+  """Normalize questions and collapse repeats.
+  
+  Returns the distinct normalized texts in first-seen order and, for every
+  question, the index of its distinct text.
+  """
+  # Normalize questions (lowercase, strip)
+  normalized = [q.lower().strip() for q in questions]
+  
+  # Users repeat the same question: embed and compare each distinct text once
+  unique_positions: Dict[str, int] = {}
+  inverse = np.fromiter(
+    (unique_positions.setdefault(q, len(unique_positions)) for q in normalized),
+    dtype=np.intp,
+    count=len(normalized),
+  )
+  return list(unique_positions), inverse
+
+
+def _normalize_rows(embeddings_array: np.ndarray) -> None:
+  """L2-normalize rows in place; the squared norms come from one einsum pass
+  without a temporary squared copy of the matrix."""
+  norms = np.sqrt(np.einsum("ij,ij->i", embeddings_array, embeddings_array))
+  embeddings_array /= (norms + np.float32(1e-8))[:, None]
+
+
+def _build_question_group(group_questions: List[str]) -> QuestionGroup:
+  """Build a group, using its shortest question as canonical (usually the clearest)."""
+  canonical = min(group_questions, key=len)
+  
+  # Remove canonical and its exact repeats from variations in one pass
+  # (string equality rejects different lengths without comparing characters)
+  variations = [q for q in group_questions if q != canonical]
+  if not variations:
+    variations = [canonical]  # If only one, still include it
+  
+  return QuestionGroup(
+    canonical_question=canonical,
+    variations=variations,
+    count=len(group_questions)
+  )
+
+
+def _sort_groups(groups: List[QuestionGroup], centroids: np.ndarray) -> Tuple[List[QuestionGroup], np.ndarray]:
+  """Sort groups by count (descending), keeping each centroid row with its group."""
+  ranking = sorted(range(len(groups)), key=lambda k: groups[k].count, reverse=True)
+  return [groups[k] for k in ranking], centroids[ranking]
+
+
+async def _group_similar_questions(
+  questions: List[str],
+  similarity_threshold: float = 0.85,
+) -> Tuple[List[QuestionGroup], Optional[np.ndarray]]:
   """
   Group similar questions using semantic similarity.
   
@@ -128,111 +291,347 @@ def _group_similar_questions(questions: List[str], similarity_threshold: float =
     similarity_threshold: Minimum cosine similarity to consider questions as similar (0-1)
   
   Returns:
-    List of QuestionGroup objects with canonical questions and variations
+    List of QuestionGroup objects with canonical questions and variations, and
+    the unit centroid of each group (None when embeddings were unavailable)
   """
   if not questions:
-    return []
+    return [], None
   
-  # Normalize questions (lowercase, strip)
-  normalized = [q.lower().strip() for q in questions]
+  unique_questions, inverse = _dedupe_questions(questions)
   
   # Get embeddings
   try:
-    embeddings = _get_embeddings_for_texts(normalized)
+    embeddings_array = await _get_cached_embeddings(unique_questions)
   except Exception as e:
     print(f"[Analytics] Failed to get embeddings, using simple grouping: {e}")
     # Fallback: group by exact match
-    question_counts = {}
-    for q in normalized:
-      question_counts[q] = question_counts.get(q, 0) + 1
+    question_counts = np.bincount(inverse)
     
     return [
       QuestionGroup(
         canonical_question=q,
         variations=[q],
-        count=count
+        count=int(count)
       )
-      for q, count in question_counts.items()
-    ]
+      for q, count in zip(unique_questions, question_counts)
+    ], None
   
-  # Convert to numpy array for efficient computation
-  embeddings_array = np.array(embeddings)
+  # The matmul and graph search are CPU-bound, keep them off the event loop
+  return await asyncio.to_thread(
+    _group_by_similarity, questions, inverse, embeddings_array, similarity_threshold
+  )
+
+
+def _group_by_similarity(
+  questions: List[str],
+  inverse: np.ndarray,
+  embeddings_array: np.ndarray,
+  similarity_threshold: float,
+) -> Tuple[List[QuestionGroup], np.ndarray]:
+  """Group questions whose embeddings are connected by pairwise similarity >= threshold.
   
-  # Group similar questions
-  groups: List[QuestionGroup] = []
-  used_indices = set()
+  embeddings_array holds one row per distinct question; inverse maps each entry of
+  questions to its row. Returns the groups and their unit centroids.
+  """
+  # Normalize once so similarities are plain matmuls
+  _normalize_rows(embeddings_array)
   
-  for i, question in enumerate(normalized):
-    if i in used_indices:
-      continue
-    
-    # Find all similar questions using cosine similarity
-    current_embedding = embeddings_array[i:i+1]
-    similarities = _cosine_similarity(current_embedding, embeddings_array)[0]
-    
-    # Find indices of similar questions
-    similar_indices = [
-      idx for idx, sim in enumerate(similarities)
-      if sim >= similarity_threshold and idx not in used_indices
-    ]
-    
+  # Similarity is symmetric, so only the upper triangle is computed: each block of
+  # rows is compared with itself and the rows after it, keeping the pairs above the threshold
+  n = len(embeddings_array)
+  # Every block writes into the same scratch buffers instead of allocating its own
+  block_size = min(SIMILARITY_BLOCK_ROWS, n) * n
+  similarity_buffer = np.empty(block_size, dtype=np.float32)
+  linked_buffer = np.empty(block_size, dtype=bool)
+  pair_rows, pair_cols = [], []
+  for start in range(0, n, SIMILARITY_BLOCK_ROWS):
+    rows = embeddings_array[start:start + SIMILARITY_BLOCK_ROWS]
+    shape = (len(rows), n - start)
+    block = _cosine_similarity(
+      rows, embeddings_array[start:], out=similarity_buffer[:shape[0] * shape[1]].reshape(shape)
+    )
+    linked = np.greater_equal(
+      block, similarity_threshold, out=linked_buffer[:shape[0] * shape[1]].reshape(shape)
+    )
+    block_rows, block_cols = np.nonzero(linked)
+    pair_rows.append(block_rows + start)
+    pair_cols.append(block_cols + start)
+  pair_rows, pair_cols = np.concatenate(pair_rows), np.concatenate(pair_cols)
+  
+  # Link every pair above the threshold; each connected component is a group
+  adjacency = coo_matrix((np.ones(len(pair_rows), dtype=bool), (pair_rows, pair_cols)), shape=(n, n))
+  n_groups, unique_labels = connected_components(adjacency, directed=False)
+  
+  # Centroid of a group: mean of its questions' unit vectors (repeats included), re-normalized
+  repeats = np.bincount(inverse, minlength=n).astype(np.float32)
+  centroids = np.zeros((n_groups, embeddings_array.shape[1]), dtype=np.float32)
+  np.add.at(centroids, unique_labels, embeddings_array * repeats[:, None])
+  _normalize_rows(centroids)
+  
+  # Fan the labels of the distinct texts back out to every question
+  labels = unique_labels[inverse]
+  
+  # Split the question indices by component label in one pass
+  order = np.argsort(labels, kind="stable")
+  boundaries = np.cumsum(np.bincount(labels, minlength=n_groups))[:-1]
+  
+  groups = [
     # Get the original questions (not normalized) for this group
-    group_questions = [questions[idx] for idx in similar_indices]
-    
-    # Use the shortest question as canonical (usually the clearest)
-    canonical = min(group_questions, key=len)
-    
-    # Remove canonical from variations
-    variations = [q for q in group_questions if q != canonical]
-    if not variations:
-      variations = [canonical]  # If only one, still include it
-    
-    groups.append(QuestionGroup(
-      canonical_question=canonical,
-      variations=variations,
-      count=len(group_questions)
-    ))
-    
-    # Mark all as used
-    used_indices.update(similar_indices)
+    _build_question_group([questions[idx] for idx in similar_indices])
+    for similar_indices in np.split(order, boundaries)
+  ]
   
-  # Sort by count (descending)
-  groups.sort(key=lambda g: g.count, reverse=True)
+  return _sort_groups(groups, centroids)
+
+
+async def _merge_new_questions(
+  groups: List[QuestionGroup],
+  centroids: np.ndarray,
+  new_questions: List[str],
+  similarity_threshold: float,
+) -> Tuple[List[QuestionGroup], np.ndarray]:
+  """Add newly asked questions to previously computed groups.
+  
+  Only the new questions are embedded. Each joins the group with the nearest
+  centroid when it is similar enough; the rest are grouped among themselves.
+  """
+  unique_questions, inverse = _dedupe_questions(new_questions)
+  embeddings_array = await _get_cached_embeddings(unique_questions)
+  return await asyncio.to_thread(
+    _assign_to_centroids, groups, centroids, new_questions, inverse, embeddings_array, similarity_threshold
+  )
+
+
+def _assign_to_centroids(
+  groups: List[QuestionGroup],
+  centroids: np.ndarray,
+  new_questions: List[str],
+  inverse: np.ndarray,
+  embeddings_array: np.ndarray,
+  similarity_threshold: float,
+) -> Tuple[List[QuestionGroup], np.ndarray]:
+  """Assign new questions to the nearest centroid with one (new x groups) matmul."""
+  _normalize_rows(embeddings_array)
+  
+  if len(groups):
+    similarities = _cosine_similarity(embeddings_array, centroids)
+    nearest = similarities.argmax(axis=1)
+    matched = similarities[np.arange(len(nearest)), nearest] >= similarity_threshold
+  else:
+    nearest = np.zeros(len(embeddings_array), dtype=np.intp)
+    matched = np.zeros(len(embeddings_array), dtype=bool)
+  
+  # Centroids are unit means, so centroid * count stands in for the members' sum
+  counts = np.array([group.count for group in groups], dtype=np.float32)
+  sums = centroids * counts[:, None]
+  joined: Dict[int, List[str]] = {}
+  unmatched = []
+  for position, question in enumerate(new_questions):
+    row = inverse[position]
+    if matched[row]:
+      joined.setdefault(int(nearest[row]), []).append(question)
+      sums[nearest[row]] += embeddings_array[row]
+    else:
+      unmatched.append(position)
+  
+  groups = list(groups)
+  for index, questions in joined.items():
+    group = groups[index]
+    # Variations leave out the canonical and its repeats (or list only the
+    # canonical when the group has nothing else): restore its copies from the count
+    others = [q for q in group.variations if q != group.canonical_question]
+    existing = [group.canonical_question] * (group.count - len(others)) + others
+    # New questions are the most recent ones, so they lead the group like a full regroup would
+    groups[index] = _build_question_group(questions + existing)
+  _normalize_rows(sums)
+  centroids = sums
+  
+  if unmatched:
+    # Questions close to no existing group form new groups among themselves
+    rows = np.unique(inverse[unmatched])
+    remap = np.empty(len(embeddings_array), dtype=np.intp)
+    remap[rows] = np.arange(len(rows))
+    new_groups, new_centroids = _group_by_similarity(
+      [new_questions[position] for position in unmatched],
+      remap[inverse[unmatched]],
+      embeddings_array[rows],
+      similarity_threshold,
+    )
+    groups += new_groups
+    centroids = np.concatenate([centroids, new_centroids])
   
-  return groups
+  return _sort_groups(groups, centroids)
+
+
+async def _store_question_groups(
+  chatbot_uuid: str,
+  topic: str,
+  question_limit: int,
+  last_message_id: int,
+  message_count: int,
+  response: TopicQuestionsResponse,
+  centroids: np.ndarray,
+) -> None:
+  """Persist a topic's grouped questions and their centroids with the version they were computed for."""
+  values = dict(
+    question_limit=question_limit,
+    last_message_id=last_message_id,
+    message_count=message_count,
+    payload=response.model_dump_json(),
+    centroids=centroids.astype(np.float32).tobytes(),
+    updated_at=datetime.utcnow(),
+  )
+  statement = insert(TopicQuestionGroupCache).values(chatbot_uuid=chatbot_uuid, topic=topic, **values)
+  statement = statement.on_conflict_do_update(
+    index_elements=["chatbot_uuid", "topic"],
+    set_={key: statement.excluded[key] for key in values},
+  )
+  async with AsyncSessionLocal() as session:
+    await session.exec(statement)
+    await session.commit()
+
+
+async def _extend_stored_groups(
+  cached: TopicQuestionGroupCache,
+  topic_messages: tuple,
+  message_count: int,
+) -> Optional[Tuple[TopicQuestionsResponse, np.ndarray]]:
+  """Extend a persisted grouping with the questions asked since it was computed.
+  
+  Returns None when it cannot be extended: older messages were removed or gained
+  the topic since, or the new questions could not be embedded.
+  """
+  new_contents = await fetch_all(
+    select(Message.content)
+    .join(Conversation, Conversation.uuid == Message.conversation_uuid)
+    .where(*topic_messages)
+    .where(Message.id > cached.last_message_id)
+    .order_by(Message.created_at.desc())
+  )
+  if cached.message_count + len(new_contents) != message_count:
+    return None
+  
+  previous = TopicQuestionsResponse.model_validate_json(cached.payload)
+  if not previous.question_groups:
+    return None
+  groups = previous.question_groups
+  centroids = np.frombuffer(cached.centroids, dtype=np.float32).reshape(len(groups), -1)
+  
+  new_questions = _question_texts(new_contents)
+  if new_questions:
+    try:
+      groups, centroids = await _merge_new_questions(
+        groups, centroids, new_questions, QUESTION_SIMILARITY_THRESHOLD
+      )
+    except Exception as e:
+      print(f"[Analytics] Failed to extend question groups, regrouping: {e}")
+      return None
+  
+  response = TopicQuestionsResponse(
+    topic=previous.topic,
+    question_groups=groups,
+    total_questions=previous.total_questions + len(new_questions),
+  )
+  return response, centroids
+
+
+def _question_texts(contents: List[str]) -> List[str]:
+  """Extract question texts, skipping blank messages."""
+  return [question for question in (content.strip() for content in contents) if question]
 
 
 @router.get("/chatbots/{chatbot_uuid}/topics/{topic}/questions", response_model=TopicQuestionsResponse)
-def get_topic_questions(
+async def get_topic_questions(
   chatbot_uuid: str,
   topic: str,
-  session: Session = Depends(get_session),
+  limit: int = Query(TOPIC_QUESTIONS_MAX, ge=1, le=TOPIC_QUESTIONS_MAX, description="Maximum number of questions to group"),
+  offset: int = Query(0, ge=0, description="Number of most recent questions to skip"),
+  since: Optional[datetime] = Query(None, description="Only include questions asked at or after this time"),
 ):
   """
-  Get all user questions for a specific topic, grouped by semantic similarity.
+  Get the most recent user questions for a specific topic, grouped by semantic similarity.
   
   Questions like "do you offer services" and "what are your services" will be
   grouped together, while "do you offer consultation service" will be separate.
   """
-  # Ensure chatbot exists
-  chatbot = session.exec(
-    select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
-  ).first()
-  if not chatbot:
-    raise HTTPException(status_code=404, detail="Chatbot not found")
+  topic_messages = (
+    Conversation.chatbot_uuid == chatbot_uuid,
+    Message.role == "user",
+    Message.topic == topic,
+  )
+  chatbot_exists = select(Chatbot.uuid).where(Chatbot.uuid == chatbot_uuid)
   
-  # Get all user messages with this topic
-  messages = session.exec(
-    select(Message)
-    .where(Message.conversation_uuid.in_(
-      select(Conversation.uuid).where(Conversation.chatbot_uuid == chatbot_uuid)
-    ))
-    .where(Message.role == "user")
-    .where(Message.topic == topic)
-    .order_by(Message.created_at.desc())
-  ).all()
+  # Get the text of the most recent user messages with this topic
+  query = (
+    select(Message.content)
+    .join(Conversation, Conversation.uuid == Message.conversation_uuid)
+    .where(*topic_messages)
+  )
+  if since:
+    # created_at is stored as naive UTC
+    if since.tzinfo:
+      since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    query = query.where(Message.created_at >= since)
+  # One extra row tells whether older questions remain
+  query = query.order_by(Message.created_at.desc()).offset(offset).limit(limit + 1)
   
-  if not messages:
+  # The default page (newest questions, no filters) is persisted and served as-is
+  # until the topic gains or loses a question
+  cacheable = offset == 0 and since is None
+  if cacheable:
+    chatbot, (last_message_id, message_count), cached = await asyncio.gather(
+      fetch_first(chatbot_exists),
+      fetch_one(
+        select(func.max(Message.id), func.count())
+        .join(Conversation, Conversation.uuid == Message.conversation_uuid)
+        .where(*topic_messages)
+      ),
+      fetch_first(
+        select(TopicQuestionGroupCache)
+        .where(TopicQuestionGroupCache.chatbot_uuid == chatbot_uuid)
+        .where(TopicQuestionGroupCache.topic == topic)
+      ),
+    )
+    if not chatbot:
+      raise HTTPException(status_code=404, detail="Chatbot not found")
+    # Entries without centroids hold exact-match groups from an embedding outage: regroup them
+    if (
+      cached
+      and cached.centroids is not None
+      and (cached.question_limit, cached.last_message_id, cached.message_count) == (limit, last_message_id, message_count)
+    ):
+      return Response(content=cached.payload, media_type="application/json")
+    
+    # While the whole topic fits in one page, new questions are merged into the
+    # stored groups through their centroids instead of regrouping everything
+    if (
+      cached
+      and cached.question_limit == limit
+      and cached.centroids is not None
+      and last_message_id > cached.last_message_id
+      and message_count <= limit
+    ):
+      extended = await _extend_stored_groups(cached, topic_messages, message_count)
+      if extended:
+        response, centroids = extended
+        await _store_question_groups(
+          chatbot_uuid, topic, limit, last_message_id, message_count, response, centroids
+        )
+        return response
+    
+    contents = await fetch_all(query)
+  else:
+    # The existence check runs alongside on its own connection
+    chatbot, contents = await asyncio.gather(fetch_first(chatbot_exists), fetch_all(query))
+    
+    # Ensure chatbot exists
+    if not chatbot:
+      raise HTTPException(status_code=404, detail="Chatbot not found")
+  
+  has_more = len(contents) > limit
+  contents = contents[:limit]
+  
+  if not contents:
     return TopicQuestionsResponse(
       topic=topic,
       question_groups=[],
@@ -240,15 +639,25 @@ def get_topic_questions(
     )
   
   # Extract question texts
-  questions = [msg.content.strip() for msg in messages if msg.content.strip()]
+  questions = _question_texts(contents)
   
   # Group similar questions
-  question_groups = _group_similar_questions(questions, similarity_threshold=0.82)
+  question_groups, centroids = await _group_similar_questions(
+    questions, similarity_threshold=QUESTION_SIMILARITY_THRESHOLD
+  )
   
-  return TopicQuestionsResponse(
+  response = TopicQuestionsResponse(
     topic=topic,
     question_groups=question_groups,
-    total_questions=len(questions)
+    total_questions=len(questions),
+    has_more=has_more
   )
+  # Exact-match fallback groups (no centroids) are not stored, so an embedding
+  # outage doesn't keep being served once embeddings work again
+  if cacheable and centroids is not None:
+    await _store_question_groups(
+      chatbot_uuid, topic, limit, last_message_id, message_count, response, centroids
+    )
+  return response
 
 
@@ -1,37 +1,32 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import Session, delete, select, update
+from starlette.concurrency import run_in_threadpool
 from app.models import Conversation, Message, Chatbot, User
 from app.services.chat_service import ChatService
 from app.services.websocket_manager import manager
 from app.services.conversation_details_service import conversation_details_service
-from app.database import get_session
+from app.services.cache_service import cache_service
+from app.services.handoff_listener import handoff_listener
+from app.database import AsyncSessionLocal, engine, fetch_first, get_session
 from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime, timezone
-from sqlalchemy import text, func
+from sqlalchemy import text, func, tuple_
+import asyncio
+import base64
+import logging
+import orjson
+import time
 import uuid as uuid_pkg
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-# Add OPTIONS handler for feedback endpoint to handle CORS preflight
-@router.options("/messages/{message_id}/feedback")
-async def options_feedback(message_id: int):
-    """Handle CORS preflight for feedback endpoint"""
-    return JSONResponse(
-        status_code=200,
-        content={},
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-            "Access-Control-Max-Age": "3600",
-        }
-    )
 chat_service = ChatService()
 
 
@@ -74,6 +69,7 @@ class PaginatedConversationsResponse(BaseModel):
     conversations: List[ConversationResponse]
     has_more: bool
     total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class SendMessageRequest(BaseModel):
@@ -87,25 +83,287 @@ class SubmitFeedbackRequest(BaseModel):
     feedback: Literal["like", "dislike"] = Field(..., description="Feedback type: 'like' or 'dislike'")
 
 
+_UTC = timezone.utc
+
+
+def _to_iso_utc(dt: Optional[datetime]) -> Optional[str]:
+    """ISO 8601 string with a 'Z' suffix; naive datetimes are taken as UTC."""
+    return None if dt is None else (dt if dt.tzinfo else dt.replace(tzinfo=_UTC)).isoformat().replace('+00:00', 'Z')
+
+
+# Columns of a conversation listing entry. Listings select them as plain rows:
+# no ORM instances are built, and building the response can't trigger lazy loads.
+_LISTING_COLUMNS = (
+    Conversation.uuid,
+    Conversation.chatbot_uuid,
+    Conversation.session_id,
+    Conversation.customer_name,
+    Conversation.customer_email,
+    Conversation.customer_phone,
+    Conversation.status,
+    Conversation.handoff_status,
+    Conversation.assigned_to_user_uuid,
+    Conversation.created_at,
+    Conversation.updated_at,
+)
+
+
+def _encode_listing_cursor(updated_at: datetime, conversation_uuid: str) -> str:
+    """Opaque keyset cursor for the conversation after which the next page starts."""
+    return base64.urlsafe_b64encode(orjson.dumps([updated_at.isoformat(), conversation_uuid])).decode()
+
+
+def _decode_listing_cursor(cursor: str) -> tuple:
+    """(updated_at, uuid) of a listing cursor; 400 if it is malformed."""
+    try:
+        updated_at, conversation_uuid = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(updated_at), str(conversation_uuid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_conversations(session: Session, query, cursor: Optional[str], offset: int, limit: int) -> tuple:
+    """One page of a conversation listing, newest first, with has_more and the next cursor.
+
+    With a cursor the page is found by seeking past (updated_at, uuid) instead of
+    skipping ``offset`` rows, so deep pages cost the same as the first one.
+    """
+    query = query.order_by(Conversation.updated_at.desc(), Conversation.uuid.desc())
+    if cursor:
+        query = query.where(tuple_(Conversation.updated_at, Conversation.uuid) < _decode_listing_cursor(cursor))
+    elif offset:
+        query = query.offset(offset)
+    
+    conversations = session.exec(query.limit(limit + 1)).all()  # One extra to check if there are more
+    has_more = len(conversations) > limit
+    if not has_more:
+        return conversations, False, None
+    conversations = conversations[:limit]
+    last = conversations[-1]
+    return conversations, True, _encode_listing_cursor(last.updated_at, last.uuid)
+
+
+def _message_summaries(session: Session, conversation_uuids: List[str], first_user: bool = False) -> dict:
+    """Last message, last user message and (optionally) first user message per conversation.
+
+    Uses one window-function query for the whole page instead of separate
+    lookups per conversation.
+    """
+    if not conversation_uuids:
+        return {}
+    
+    is_user = Message.role == "user"
+    columns = [
+        Message.conversation_uuid,
+        Message.content,
+        is_user.label("is_user"),
+        func.row_number().over(
+            partition_by=Message.conversation_uuid, order_by=Message.created_at.desc()
+        ).label("last_rn"),
+        func.row_number().over(
+            partition_by=(Message.conversation_uuid, is_user), order_by=Message.created_at.desc()
+        ).label("last_user_rn"),
+    ]
+    if first_user:
+        columns.append(
+            func.row_number().over(
+                partition_by=(Message.conversation_uuid, is_user), order_by=Message.created_at.asc()
+            ).label("first_user_rn")
+        )
+    ranked = select(*columns).where(Message.conversation_uuid.in_(conversation_uuids)).subquery()
+    
+    picked = (ranked.c.last_rn == 1) | (ranked.c.is_user & (ranked.c.last_user_rn == 1))
+    if first_user:
+        picked = picked | (ranked.c.is_user & (ranked.c.first_user_rn == 1))
+    
+    summaries = {}
+    for row in session.exec(select(*ranked.c).where(picked)).all():
+        summary = summaries.setdefault(row.conversation_uuid, {})
+        if row.last_rn == 1:
+            summary["last_message"] = row.content
+        if row.is_user and row.last_user_rn == 1:
+            summary["last_user_message"] = row.content
+        if first_user and row.is_user and row.first_user_rn == 1:
+            summary["first_user_message"] = row.content
+    return summaries
+
+
+async def _conversation_total(session: Session, count_query, chatbot_uuid: str, scope: str) -> int:
+    """Exact conversation count for a listing, cached briefly in Redis."""
+    total = await cache_service.get_conversation_count(chatbot_uuid, scope)
+    if total is None:
+        total = session.exec(count_query).one()
+        await cache_service.set_conversation_count(chatbot_uuid, scope, total)
+    return total
+
+
+async def _get_chatbot_status(chatbot_uuid: str) -> Optional[dict]:
+    """Status fields of a chatbot (is_active, workspace_uuid), or None if it doesn't exist.
+
+    Served from Redis when possible; the chatbot update/delete endpoints drop the entry.
+    """
+    chatbot_status = await cache_service.get_chatbot_status(chatbot_uuid)
+    if chatbot_status is None:
+        row = await fetch_first(
+            select(Chatbot.is_active, Chatbot.workspace_uuid).where(Chatbot.uuid == chatbot_uuid)
+        )
+        if row is None:
+            return None
+        chatbot_status = {"is_active": row.is_active, "workspace_uuid": row.workspace_uuid}
+        await cache_service.set_chatbot_status(chatbot_uuid, chatbot_status)
+    return chatbot_status
+
+
+# Fire-and-forget tasks are referenced here until they finish, so they aren't garbage collected
+_background_tasks = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _update_conversation_details(conversation_uuid: str, message_text: str) -> None:
+    """Fill in missing customer details from a message (blocking: may call the LLM)."""
+    with Session(engine) as session:
+        conversation = session.get(Conversation, conversation_uuid)
+        if conversation:
+            conversation_details_service.update_conversation_details(
+                conversation=conversation,
+                message_text=message_text,
+                session=session
+            )
+
+
+async def _broadcast_turn(chatbot_uuid: str, conversation_uuid: str, events: List[dict]) -> None:
+    """Send the dashboard updates of one chat turn as a single "turn" event."""
+    if events:
+        await manager.broadcast_to_dashboard({
+            "type": "turn",
+            "conversation_uuid": conversation_uuid,
+            "chatbot_uuid": chatbot_uuid,
+            "events": events
+        }, chatbot_uuid)
+
+
+async def _persist_and_broadcast(
+    chatbot_uuid: str, conversation_uuid: str, user_message: str, sent_at: datetime,
+    dashboard_events: List[dict]
+) -> None:
+    """Save a user message sent during a handoff, then notify the dashboard.
+
+    Runs in the background so the socket can acknowledge the message right away.
+    ``dashboard_events`` holds the turn's earlier dashboard updates, sent along
+    with the new message.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            customer = (await session.exec(
+                update(Conversation)
+                .where(Conversation.uuid == conversation_uuid)
+                .values(updated_at=sent_at)
+                .returning(Conversation.customer_name, Conversation.customer_email, Conversation.customer_phone)
+            )).first()
+            session.add(Message(
+                conversation_uuid=conversation_uuid,
+                role="user",
+                content=user_message,
+                created_at=sent_at
+            ))
+            await session.commit()
+        
+        # Extract and update conversation details, unless they are all known already
+        if customer and not (
+            customer.customer_email and customer.customer_phone
+            and customer.customer_name and customer.customer_name != "Anonymous"
+        ):
+            await run_in_threadpool(_update_conversation_details, conversation_uuid, user_message)
+        
+        # Broadcast new message to dashboard (like WhatsApp)
+        dashboard_events.append({
+            "type": "new_message",
+            "conversation_uuid": conversation_uuid,
+            "chatbot_uuid": chatbot_uuid,
+            "role": "user"
+        })
+    except Exception as e:
+        logger.exception(f"Error saving handoff message for conversation {conversation_uuid}: {e}")
+    await _broadcast_turn(chatbot_uuid, conversation_uuid, dashboard_events)
+
+
+# Pings arriving sooner than this after the last pong are not answered
+PONG_INTERVAL_SECONDS = 15
+
+# Streamed deltas are a few characters each; they are merged into frames of
+# at least this many characters, or sent once this many seconds have passed
+CHUNK_FLUSH_CHARS = 64
+CHUNK_FLUSH_SECONDS = 0.05
+
+
+class _ChunkCoalescer:
+    """Buffers streamed assistant deltas and sends them as fewer message_chunk frames."""
+
+    def __init__(self, session_id: str, timestamp: str):
+        self.session_id = session_id
+        # Chunks aren't ordered by time, so every frame of a turn carries the turn's timestamp
+        self.timestamp = timestamp
+        self._buf: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    async def add(self, delta: str) -> None:
+        """Buffer a delta, sending the buffer once it is large or old enough."""
+        self._buf.append(delta)
+        self._size += len(delta)
+        if self._size >= CHUNK_FLUSH_CHARS or time.monotonic() - self._last_flush >= CHUNK_FLUSH_SECONDS:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send whatever is buffered as one frame."""
+        self._last_flush = time.monotonic()
+        if not self._buf:
+            return
+        content = "".join(self._buf)
+        self._buf.clear()
+        self._size = 0
+        await manager.send_message(
+            {
+                "type": "message_chunk",
+                "role": "assistant",
+                "content": content,
+                "timestamp": self.timestamp,
+            },
+            self.session_id,
+        )
+
+
 # WebSocket endpoint
 @router.websocket("/ws/{chatbot_uuid}")
 async def websocket_endpoint(
     websocket: WebSocket,
     chatbot_uuid: str,
     session_id: str = Query(...),
-    client_uuid: Optional[str] = Query(None),
-    session: Session = Depends(get_session)
+    client_uuid: Optional[str] = Query(None)
 ):
-    """WebSocket endpoint for real-time chat - allows connections from any origin for widget embedding"""
+    """WebSocket endpoint for real-time chat - allows connections from any origin for widget embedding
+
+    The socket does not hold a database session: each message turn opens a
+    short-lived one, so idle widgets don't pin pooled connections.
+    """
     await manager.connect(websocket, session_id, chatbot_uuid)
     
+    # Handoff status of the conversation, kept current by the worker's handoff
+    # listener so chat turns don't re-read the conversation
+    conversation_uuid = None
+    handoff_state = {"handoff_status": "ai"}
+    synced_generation = None
+    
     try:
         # Verify chatbot exists
-        chatbot = session.exec(
-            select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
-        ).first()
+        chatbot_status = await _get_chatbot_status(chatbot_uuid)
         
-        if not chatbot:
+        if chatbot_status is None:
             await websocket.send_json({
                 "type": "error",
                 "message": "Chatbot not found"
@@ -115,7 +373,7 @@ async def websocket_endpoint(
             return
         
         # Check if chatbot is active
-        if not chatbot.is_active:
+        if not chatbot_status["is_active"]:
             await websocket.send_json({
                 "type": "error",
                 "message": "Chatbot is not active"
@@ -125,7 +383,6 @@ async def websocket_endpoint(
             return
         
         # Don't create conversation yet - wait for first message
-        conversation = None
         
         # Send connection success message
         await websocket.send_json({
@@ -138,258 +395,200 @@ async def websocket_endpoint(
         
         if is_dashboard:
             # Dashboard connections just listen for broadcasts
-            print(f"[WS] Dashboard listener connected: {session_id}")
+            logger.debug("Dashboard listener connected: %s", session_id)
             # Keep connection alive - it will receive broadcasts from other parts
             try:
                 while True:
                     # Just wait - connection will receive broadcasts
                     await websocket.receive_text()  # Keep connection alive
             except Exception as e:
-                print(f"[WS] Dashboard connection closed: {e}")
+                logger.debug("Dashboard connection closed: %s", e)
                 manager.disconnect(websocket, session_id)
                 return
         
         # Listen for messages (widget connections only)
+        last_pong = -PONG_INTERVAL_SECONDS
         while True:
-            print(f"[WS] Waiting for message from session {session_id}...")
             data = await websocket.receive_json()
-            print(f"[WS] ✅ Received data: {data}")
+            logger.debug("Received data from session %s: %s", session_id, data)
             
             message_type = data.get("type")
-            print(f"[WS] Message type: {message_type}")
             
-            # Handle ping messages (keep-alive)
+            # Handle ping messages (keep-alive); any frame keeps the socket open,
+            # so frequent pings are only answered once per interval
             if message_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                now = time.monotonic()
+                if now - last_pong > PONG_INTERVAL_SECONDS:
+                    manager.enqueue(websocket, {"type": "pong"})
+                    last_pong = now
                 continue
             
             if message_type == "message":
                 user_message = data.get("message")
-                print(f"[WS] User message: '{user_message}'")
                 
                 if not user_message:
-                    print(f"[WS] ⚠️ Empty message, skipping")
+                    logger.debug("Empty message, skipping")
                     continue
                 
-                # Create conversation on first message
-                if conversation is None:
-                    try:
-                        # Generate client_uuid if not provided
-                        final_client_uuid = client_uuid
-                        if not final_client_uuid:
-                            final_client_uuid = str(uuid_pkg.uuid4())
-                            print(f"[WS] Generated new client_uuid: {final_client_uuid}")
-                        else:
-                            print(f"[WS] Using provided client_uuid: {final_client_uuid}")
-                        
-                        print(f"[WS] Creating conversation for session {session_id} with client_uuid {final_client_uuid}...")
-                        conversation = chat_service.get_or_create_conversation(
-                            chatbot_uuid=chatbot_uuid,
-                            session_id=session_id,
-                            client_uuid=final_client_uuid,
-                            session=session
-                        )
-                        
-                        if not conversation:
-                            raise ValueError("Failed to create conversation: get_or_create_conversation returned None")
+                # Dashboard updates of this turn, broadcast together at its end
+                dashboard_events = []
+                
+                # Per-turn session: the socket holds no DB connection between messages
+                with Session(engine) as session:
+                    # Create conversation on first message
+                    if conversation_uuid is None:
+                        try:
+                            # Generate client_uuid if not provided
+                            final_client_uuid = client_uuid
+                            if not final_client_uuid:
+                                final_client_uuid = str(uuid_pkg.uuid4())
+                                logger.debug("Generated new client_uuid: %s", final_client_uuid)
+                            else:
+                                logger.debug("Using provided client_uuid: %s", final_client_uuid)
+                            
+                            conversation = chat_service.get_or_create_conversation(
+                                chatbot_uuid=chatbot_uuid,
+                                session_id=session_id,
+                                client_uuid=final_client_uuid,
+                                session=session
+                            )
+                            
+                            if not conversation:
+                                raise ValueError("Failed to create conversation: get_or_create_conversation returned None")
+                            
+                            logger.debug("Conversation %s ready for session %s", conversation.uuid, session_id)
+                            conversation_uuid = conversation.uuid
+                            # Watch before the status is read below and before the client
+                            # learns the conversation uuid, so no handoff can be missed
+                            handoff_listener.watch(conversation_uuid, handoff_state)
+                            
+                            # Send conversation_uuid and client_uuid to client
+                            await manager.send_message({
+                                "type": "conversation_created",
+                                "conversation_uuid": conversation.uuid,
+                                "client_uuid": final_client_uuid,
+                                "session_id": session_id
+                            }, session_id)
+                            
+                            # Broadcast new conversation to dashboard (like WhatsApp), with the rest of the turn
+                            dashboard_events.append({
+                                "type": "conversation_created",
+                                "conversation_uuid": conversation.uuid,
+                                "chatbot_uuid": chatbot_uuid
+                            })
+                        except Exception as e:
+                            logger.exception(f"Error creating conversation: {e}")
+                            await manager.send_message({
+                                "type": "error",
+                                "message": "Failed to initialize conversation"
+                            }, session_id)
+                            continue
+                    if not handoff_listener.live or synced_generation != handoff_listener.generation:
+                        # First turn, or updates may have been missed (Redis unavailable or
+                        # resubscribed): read the status from the database
+                        synced_generation = handoff_listener.generation
+                        handoff_state["handoff_status"] = session.exec(
+                            select(Conversation.handoff_status).where(Conversation.uuid == conversation_uuid)
+                        ).one()
+                    handoff_status = handoff_state["handoff_status"]
+                    logger.debug("Conversation %s handoff_status: %s", conversation_uuid, handoff_status)
+                    
+                    # Check if conversation is in human handoff mode
+                    if handoff_status == "human":
+                        # Save user message but don't process with AI
+                        # Don't echo it back - widget already shows it optimistically
+                        _spawn(_persist_and_broadcast(
+                            chatbot_uuid, conversation_uuid, user_message, datetime.utcnow(), dashboard_events
+                        ))
                         
-                        print(f"[WS] ✅ Conversation created: {conversation.uuid}")
+                        # The agent will see it in the Activity page
+                        # AI will NOT respond - only human agents can respond now
+                        continue
+                    
+                    # In this case, just save the message and let the agent handle it
+                    if handoff_status == "requested":
+                        _spawn(_persist_and_broadcast(
+                            chatbot_uuid, conversation_uuid, user_message, datetime.utcnow(), dashboard_events
+                        ))
                         
-                        # Send conversation_uuid and client_uuid to client
+                        # Send acknowledgment that message was received
                         await manager.send_message({
-                            "type": "conversation_created",
-                            "conversation_uuid": conversation.uuid,
-                            "client_uuid": final_client_uuid,
-                            "session_id": session_id
-                        }, session_id)
-                        
-                        # Broadcast new conversation to dashboard (like WhatsApp)
-                        await manager.broadcast_to_dashboard({
-                            "type": "conversation_created",
-                            "conversation_uuid": conversation.uuid,
-                            "chatbot_uuid": chatbot_uuid
-                        }, chatbot_uuid)
-                    except Exception as e:
-                        print(f"[WS] ❌ Error creating conversation: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        await manager.send_message({
-                            "type": "error",
-                            "message": "Failed to initialize conversation"
+                            "type": "message",
+                            "role": "assistant",
+                            "content": "Your message has been received. A customer service representative will respond shortly.",
+                            "timestamp": datetime.utcnow().isoformat() + "Z"
                         }, session_id)
                         continue
-                
-                # Always refresh conversation from database to get latest handoff_status
-                # This ensures we have the most up-to-date status after a human takes over
-                session.refresh(conversation)
-                print(f"[WS] Conversation handoff_status: {conversation.handoff_status}, assigned_to: {conversation.assigned_to_user_uuid}")
-                
-                # Check if conversation is in human handoff mode
-                if conversation.handoff_status == "human":
-                    print(f"[WS] ⚠️ Conversation is in human handoff mode - AI will not respond")
-                    # Save user message but don't process with AI
-                    # Don't echo it back - widget already shows it optimistically
-                    user_msg = Message(
-                        conversation_uuid=conversation.uuid,
-                        role="user",
-                        content=user_message
-                    )
-                    session.add(user_msg)
-                    conversation.updated_at = datetime.utcnow()
-                    session.add(conversation)
-                    session.commit()
-                    
-                    # Extract and update conversation details
-                    conversation_details_service.update_conversation_details(
-                        conversation=conversation,
-                        message_text=user_message,
-                        session=session
-                    )
-                    
-                    # Broadcast new message to dashboard (like WhatsApp)
-                    await manager.broadcast_to_dashboard({
-                        "type": "new_message",
-                        "conversation_uuid": conversation.uuid,
-                        "chatbot_uuid": chatbot_uuid,
-                        "role": "user"
-                    }, chatbot_uuid)
-                    
-                    # The agent will see it in the Activity page
-                    # AI will NOT respond - only human agents can respond now
-                    print(f"[WS] ✅ User message saved, waiting for human agent response")
-                    continue
-                
-                # In this case, just save the message and let the agent handle it
-                if conversation.handoff_status == "requested":
-                    # Save user message
-                    user_msg = Message(
-                        conversation_uuid=conversation.uuid,
-                        role="user",
-                        content=user_message
-                    )
-                    session.add(user_msg)
-                    conversation.updated_at = datetime.utcnow()
-                    session.add(conversation)
-                    session.commit()
-                    
-                    # Extract and update conversation details
-                    conversation_details_service.update_conversation_details(
-                        conversation=conversation,
-                        message_text=user_message,
-                        session=session
-                    )
-                    
-                    # Broadcast new message to dashboard (like WhatsApp)
-                    await manager.broadcast_to_dashboard({
-                        "type": "new_message",
-                        "conversation_uuid": conversation.uuid,
-                        "chatbot_uuid": chatbot_uuid,
-                        "role": "user"
-                    }, chatbot_uuid)
                     
-                    # Send acknowledgment that message was received
+                    # Send typing indicator
                     await manager.send_message({
-                        "type": "message",
-                        "role": "assistant",
-                        "content": "Your message has been received. A customer service representative will respond shortly.",
-                        "timestamp": datetime.utcnow().isoformat() + "Z"
+                        "type": "typing",
+                        "is_typing": True
                     }, session_id)
-                    continue
-                
-                # Send typing indicator
-                print(f"[WS] Sending typing indicator...")
-                await manager.send_message({
-                    "type": "typing",
-                    "is_typing": True
-                }, session_id)
-                print(f"[WS] ✅ Typing indicator sent")
-                
-                try:
-                    # Process message with RAG and stream the AI response
-                    print(f"[WS] Processing message with AI (streaming) for conversation {conversation.uuid}...")
-
-                    async def handle_chunk(delta: str) -> None:
-                        """Send incremental assistant chunks to the client."""
-                        await manager.send_message(
-                            {
-                                "type": "message_chunk",
-                                "role": "assistant",
-                                "content": delta,
-                                "timestamp": datetime.utcnow().isoformat() + "Z",
-                            },
-                            session_id,
+                    
+                    chunks = _ChunkCoalescer(session_id, datetime.utcnow().isoformat() + "Z")
+                    try:
+                        # Process message with RAG and stream the AI response
+                        ai_response, assistant_message_id = await chat_service.stream_message(
+                            chatbot_uuid=chatbot_uuid,
+                            conversation_uuid=conversation_uuid,
+                            user_message=user_message,
+                            session=session,
+                            on_chunk=chunks.add,
                         )
+                        await chunks.flush()
 
-                    ai_response = await chat_service.stream_message(
-                        chatbot_uuid=chatbot_uuid,
-                        conversation_uuid=conversation.uuid,
-                        user_message=user_message,
-                        session=session,
-                        on_chunk=handle_chunk,
-                    )
+                        logger.debug("AI streaming completed for conversation %s (%d chars)", conversation_uuid, len(ai_response))
 
-                    print(f"[WS] ✅ AI streaming completed. Final response: {ai_response[:100]}...")
+                        # Stop typing indicator
+                        await manager.send_message({
+                            "type": "typing",
+                            "is_typing": False
+                        }, session_id)
 
-                    # Stop typing indicator
-                    print(f"[WS] Stopping typing indicator...")
-                    await manager.send_message({
-                        "type": "typing",
-                        "is_typing": False
-                    }, session_id)
-                    print(f"[WS] ✅ Typing stopped")
-
-                    # Get the last assistant message to include its ID
-                    last_message = session.exec(
-                        select(Message)
-                        .where(Message.conversation_uuid == conversation.uuid)
-                        .where(Message.role == "assistant")
-                        .order_by(Message.created_at.desc())
-                        .limit(1)
-                    ).first()
-
-                    # Notify client that the message stream is complete
-                    complete_payload = {
-                        "type": "message_complete",
-                        "role": "assistant",
-                        "content": ai_response,
-                        "timestamp": datetime.utcnow().isoformat() + "Z"
-                    }
-                    if last_message:
-                        complete_payload["id"] = last_message.id
-                    await manager.send_message(complete_payload, session_id)
-
-                    # Broadcast new message to dashboard (like WhatsApp)
-                    await manager.broadcast_to_dashboard({
-                        "type": "new_message",
-                        "conversation_uuid": conversation.uuid,
-                        "chatbot_uuid": chatbot_uuid,
-                        "role": "assistant"
-                    }, chatbot_uuid)
-
-                except Exception as e:
-                    print(f"[WS] ❌ Error processing message (streaming): {e}")
-                    import traceback
-                    traceback.print_exc()
-                    # Stop typing indicator
-                    await manager.send_message({
-                        "type": "typing",
-                        "is_typing": False
-                    }, session_id)
-                    # Send the actual error message to the client
-                    error_message = str(e) if str(e) else "Failed to process message"
-                    await manager.send_message({
-                        "type": "error",
-                        "message": error_message
-                    }, session_id)
-            
-            elif message_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                        # Notify client that the message stream is complete
+                        await manager.send_message({
+                            "type": "message_complete",
+                            "role": "assistant",
+                            "content": ai_response,
+                            "timestamp": datetime.utcnow().isoformat() + "Z",
+                            "id": assistant_message_id
+                        }, session_id)
+
+                        # Broadcast new message to dashboard (like WhatsApp)
+                        dashboard_events.append({
+                            "type": "new_message",
+                            "conversation_uuid": conversation_uuid,
+                            "chatbot_uuid": chatbot_uuid,
+                            "role": "assistant"
+                        })
+
+                    except Exception as e:
+                        logger.exception(f"Error processing message (streaming): {e}")
+                        # Deliver what was streamed before the failure
+                        await chunks.flush()
+                        # Stop typing indicator
+                        await manager.send_message({
+                            "type": "typing",
+                            "is_typing": False
+                        }, session_id)
+                        # Send the actual error message to the client
+                        error_message = str(e) if str(e) else "Failed to process message"
+                        await manager.send_message({
+                            "type": "error",
+                            "message": error_message
+                        }, session_id)
+                    
+                    await _broadcast_turn(chatbot_uuid, conversation_uuid, dashboard_events)
     
     except WebSocketDisconnect:
         manager.disconnect(websocket, session_id)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket, session_id)
+    finally:
+        if conversation_uuid is not None:
+            handoff_listener.unwatch(conversation_uuid, handoff_state)
 
 
 # REST endpoints
@@ -402,11 +601,7 @@ async def send_message(
     """Send a message to the chatbot (REST endpoint as fallback)"""
     
     # Verify chatbot exists
-    chatbot = session.exec(
-        select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
-    ).first()
-    
-    if not chatbot:
+    if await _get_chatbot_status(chatbot_uuid) is None:
         raise HTTPException(status_code=404, detail="Chatbot not found")
     
     # Get or create conversation
@@ -427,98 +622,57 @@ async def send_message(
     
     # Process message
     try:
-        ai_response = await chat_service.process_message(
+        # The saved assistant message is returned directly, no need to look it up again
+        return await chat_service.process_message(
             chatbot_uuid=chatbot_uuid,
             conversation_uuid=conversation.uuid,
             user_message=request.message,
             session=session
         )
-        
-        # Get the last assistant message
-        last_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == conversation.uuid)
-            .where(Message.role == "assistant")
-            .order_by(Message.created_at.desc())
-            .limit(1)
-        ).first()
-        
-        return last_message
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{chatbot_uuid}/conversations", response_model=PaginatedConversationsResponse)
+@router.get(
+    "/{chatbot_uuid}/conversations",
+    response_class=ORJSONResponse,
+    responses={200: {"model": PaginatedConversationsResponse}},
+)
 async def get_conversations(
     chatbot_uuid: str,
     status_filter: Optional[str] = None,
     limit: int = 20,
     offset: int = 0,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over offset"),
+    include_total: bool = Query(False, description="Also return the total number of matching conversations"),
     session: Session = Depends(get_session)
 ):
     """Get paginated conversations for a chatbot"""
     
     # Build base query
-    query = select(Conversation).where(Conversation.chatbot_uuid == chatbot_uuid)
+    query = select(*_LISTING_COLUMNS).where(Conversation.chatbot_uuid == chatbot_uuid)
     
     if status_filter:
         query = query.where(Conversation.status == status_filter)
     
-    # Get total count for pagination info
-    count_query = select(func.count()).select_from(Conversation).where(Conversation.chatbot_uuid == chatbot_uuid)
-    if status_filter:
-        count_query = count_query.where(Conversation.status == status_filter)
-    total = session.exec(count_query).one()
-    
-    # Apply pagination
-    conversations = session.exec(
-        query.order_by(Conversation.updated_at.desc())
-        .offset(offset)
-        .limit(limit + 1)  # Fetch one extra to check if there are more
-    ).all()
+    # Total count is only computed on request; has_more is enough for infinite scroll
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(Conversation).where(Conversation.chatbot_uuid == chatbot_uuid)
+        if status_filter:
+            count_query = count_query.where(Conversation.status == status_filter)
+        total = await _conversation_total(session, count_query, chatbot_uuid, f"status={status_filter or ''}")
     
-    # Check if there are more results
-    has_more = len(conversations) > limit
-    if has_more:
-        conversations = conversations[:limit]  # Remove the extra item
+    conversations, has_more, next_cursor = _page_conversations(session, query, cursor, offset, limit)
     
     # Enrich conversations with last message and last user message
+    summaries = _message_summaries(session, [conv.uuid for conv in conversations])
     enriched_conversations = []
     for conv in conversations:
-        # Get last message (any role)
-        last_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == conv.uuid)
-            .order_by(Message.created_at.desc())
-            .limit(1)
-        ).first()
-        
-        # Get last user message
-        last_user_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == conv.uuid)
-            .where(Message.role == "user")
-            .order_by(Message.created_at.desc())
-            .limit(1)
-        ).first()
+        summary = summaries.get(conv.uuid, {})
         
         # Create response dict with additional fields
-        # Ensure dates are timezone-aware and serialized with 'Z' suffix
-        def serialize_datetime(dt):
-            """Serialize datetime to ISO format with UTC timezone"""
-            if dt is None:
-                return None
-            # If datetime is naive (no timezone), assume it's UTC
-            if dt.tzinfo is None:
-                from datetime import timezone
-                dt = dt.replace(tzinfo=timezone.utc)
-            # Ensure it ends with 'Z' for UTC
-            iso_str = dt.isoformat()
-            if not iso_str.endswith('Z') and dt.tzinfo == timezone.utc:
-                iso_str = iso_str.replace('+00:00', 'Z')
-            return iso_str
-        
         conv_dict = {
             "uuid": conv.uuid,
             "chatbot_uuid": conv.chatbot_uuid,
@@ -529,18 +683,20 @@ async def get_conversations(
             "status": conv.status,
             "handoff_status": conv.handoff_status,
             "assigned_to_user_uuid": conv.assigned_to_user_uuid,
-            "created_at": serialize_datetime(conv.created_at),
-            "updated_at": serialize_datetime(conv.updated_at),
-            "last_message": last_message.content if last_message else None,
-            "last_user_message": last_user_message.content if last_user_message else None,
+            "created_at": _to_iso_utc(conv.created_at),
+            "updated_at": _to_iso_utc(conv.updated_at),
+            "last_message": summary.get("last_message"),
+            "last_user_message": summary.get("last_user_message"),
         }
         enriched_conversations.append(conv_dict)
     
-    return PaginatedConversationsResponse(
-        conversations=enriched_conversations,
-        has_more=has_more,
-        total=total
-    )
+    # The dicts are already in response shape: encode them directly instead of re-validating
+    return ORJSONResponse({
+        "conversations": enriched_conversations,
+        "has_more": has_more,
+        "total": total,
+        "next_cursor": next_cursor,
+    })
 
 
 def get_optional_user(
@@ -639,7 +795,11 @@ async def get_conversation_messages(
     return messages
 
 
-@router.get("/{chatbot_uuid}/conversations/by-session", response_model=PaginatedConversationsResponse)
+@router.get(
+    "/{chatbot_uuid}/conversations/by-session",
+    response_class=ORJSONResponse,
+    responses={200: {"model": PaginatedConversationsResponse}},
+)
 async def get_conversations_by_session(
     chatbot_uuid: str,
     session_id: Optional[str] = Query(None, description="Session ID to get conversations for (backward compatibility)"),
@@ -647,6 +807,8 @@ async def get_conversations_by_session(
     status_filter: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; takes precedence over offset"),
+    include_total: bool = Query(False, description="Also return the total number of matching conversations"),
     session: Session = Depends(get_session)
 ):
     """Get conversations for a specific client_uuid or session_id - secure endpoint for widget"""
@@ -654,7 +816,7 @@ async def get_conversations_by_session(
     # Prefer client_uuid over session_id for grouping conversations
     if client_uuid:
         # Build query with client_uuid filter
-        query = select(Conversation).where(
+        query = select(*_LISTING_COLUMNS).where(
             Conversation.chatbot_uuid == chatbot_uuid
         ).where(
             Conversation.client_uuid == client_uuid
@@ -671,9 +833,10 @@ async def get_conversations_by_session(
         )
         if status_filter:
             count_query = count_query.where(Conversation.status == status_filter)
+        count_scope = f"client={client_uuid}:status={status_filter or ''}"
     elif session_id:
         # Fallback to session_id for backward compatibility
-        query = select(Conversation).where(
+        query = select(*_LISTING_COLUMNS).where(
             Conversation.chatbot_uuid == chatbot_uuid
         ).where(
             Conversation.session_id == session_id
@@ -690,61 +853,29 @@ async def get_conversations_by_session(
         )
         if status_filter:
             count_query = count_query.where(Conversation.status == status_filter)
+        count_scope = f"session={session_id}:status={status_filter or ''}"
     else:
         raise HTTPException(
             status_code=400,
             detail="Either client_uuid or session_id must be provided"
         )
     
-    total = session.exec(count_query).one()
+    total = None
+    if include_total:
+        total = await _conversation_total(session, count_query, chatbot_uuid, count_scope)
     
-    # Apply pagination
-    conversations = session.exec(
-        query.order_by(Conversation.updated_at.desc())
-        .offset(offset)
-        .limit(limit + 1)
-    ).all()
-    
-    # Check if there are more results
-    has_more = len(conversations) > limit
-    if has_more:
-        conversations = conversations[:limit]
+    conversations, has_more, next_cursor = _page_conversations(session, query, cursor, offset, limit)
     
     # Enrich conversations with last message and title
+    summaries = _message_summaries(session, [conv.uuid for conv in conversations], first_user=True)
     enriched_conversations = []
     for conv in conversations:
-        # Get first user message for title
-        first_user_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == conv.uuid)
-            .where(Message.role == "user")
-            .order_by(Message.created_at.asc())
-            .limit(1)
-        ).first()
-        
-        # Get last message
-        last_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == conv.uuid)
-            .order_by(Message.created_at.desc())
-            .limit(1)
-        ).first()
-        
-        def serialize_datetime(dt):
-            if dt is None:
-                return None
-            if dt.tzinfo is None:
-                from datetime import timezone
-                dt = dt.replace(tzinfo=timezone.utc)
-            iso_str = dt.isoformat()
-            if not iso_str.endswith('Z') and dt.tzinfo == timezone.utc:
-                iso_str = iso_str.replace('+00:00', 'Z')
-            return iso_str
+        summary = summaries.get(conv.uuid, {})
         
         # Generate title from first user message
-        title = None
-        if first_user_message:
-            title = first_user_message.content.strip()
+        title = summary.get("first_user_message")
+        if title is not None:
+            title = title.strip()
             if len(title) > 50:
                 title = title[:50] + "..."
         
@@ -758,18 +889,20 @@ async def get_conversations_by_session(
             "status": conv.status,
             "handoff_status": conv.handoff_status,
             "assigned_to_user_uuid": conv.assigned_to_user_uuid,
-            "created_at": serialize_datetime(conv.created_at),
-            "updated_at": serialize_datetime(conv.updated_at),
-            "last_message": last_message.content if last_message else None,
+            "created_at": _to_iso_utc(conv.created_at),
+            "updated_at": _to_iso_utc(conv.updated_at),
+            "last_message": summary.get("last_message"),
             "last_user_message": title,  # Use title as last_user_message for widget
         }
         enriched_conversations.append(conv_dict)
     
-    return PaginatedConversationsResponse(
-        conversations=enriched_conversations,
-        has_more=has_more,
-        total=total
-    )
+    # The dicts are already in response shape: encode them directly instead of re-validating
+    return ORJSONResponse({
+        "conversations": enriched_conversations,
+        "has_more": has_more,
+        "total": total,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.patch("/conversations/{conversation_uuid}/status")
@@ -780,15 +913,17 @@ async def update_conversation_status(
 ):
     """Update conversation status (active/archived)"""
     
-    conversation = session.exec(
-        select(Conversation).where(Conversation.uuid == conversation_uuid)
+    # Update in place; RETURNING tells whether the conversation exists
+    updated = session.exec(
+        update(Conversation)
+        .where(Conversation.uuid == conversation_uuid)
+        .values(status=status)
+        .returning(Conversation.uuid)
     ).first()
     
-    if not conversation:
+    if not updated:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    conversation.status = status
-    session.add(conversation)
     session.commit()
     
     return {"message": "Status updated", "status": status}
@@ -800,54 +935,27 @@ async def submit_feedback(
     request: SubmitFeedbackRequest,
     session: Session = Depends(get_session)
 ):
-    """Submit feedback (like/dislike) for an AI assistant message - allows CORS from any origin for widget embedding"""
+    """Submit feedback (like/dislike) for an AI assistant message - CORS from any origin is set in main.PUBLIC_CORS_PATHS"""
     
-    # Get the message
+    # Only assistant messages can receive feedback: validate and update in one statement
     message = session.exec(
-        select(Message).where(Message.id == message_id)
-    ).first()
+        update(Message)
+        .where(Message.id == message_id, Message.role == "assistant")
+        .values(feedback=request.feedback)
+        .returning(Message)
+    ).scalars().first()
     
     if not message:
-        # Return with CORS headers for widget embedding
-        return JSONResponse(
-            status_code=404,
-            content={"detail": "Message not found"},
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-            }
-        )
+        # Nothing updated: tell a missing message from a non-assistant one
+        if session.exec(select(Message.id).where(Message.id == message_id)).first() is None:
+            raise HTTPException(status_code=404, detail="Message not found")
+        raise HTTPException(status_code=400, detail="Feedback can only be submitted for assistant messages")
     
-    # Only assistant messages can receive feedback
-    if message.role != "assistant":
-        # Return with CORS headers for widget embedding
-        return JSONResponse(
-            status_code=400,
-            content={"detail": "Feedback can only be submitted for assistant messages"},
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-            }
-        )
-    
-    # Update feedback
-    message.feedback = request.feedback
-    session.add(message)
+    # Dump before commit expires the returned row, so no refresh query is needed
+    content = message.model_dump()
     session.commit()
-    session.refresh(message)
-    
-    # Return with CORS headers for widget embedding
-    return JSONResponse(
-        status_code=200,
-        content=jsonable_encoder(message),
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
+    
+    return ORJSONResponse(content)
 
 
 @router.delete("/{chatbot_uuid}/conversations/cleanup", status_code=status.HTTP_204_NO_CONTENT)
@@ -857,22 +965,13 @@ async def cleanup_empty_conversations(
 ):
     """Delete all conversations with no messages for a specific chatbot"""
     
-    # Get all conversation UUIDs that have messages
-    message_query = select(Message.conversation_uuid).distinct()
-    conversation_uuids_with_messages = session.exec(message_query).all()
-    
-    # Find conversations without messages for this chatbot
-    conversations_to_delete = session.exec(
-        select(Conversation).where(
+    # Bulk delete with an anti-join, without loading the conversations or message uuids
+    session.exec(
+        delete(Conversation).where(
             Conversation.chatbot_uuid == chatbot_uuid,
-            Conversation.uuid.not_in(conversation_uuids_with_messages)
+            ~select(Message.id).where(Message.conversation_uuid == Conversation.uuid).exists(),
         )
-    ).all()
-    
-    # Delete them
-    for conv in conversations_to_delete:
-        session.delete(conv)
-    
+    )
     session.commit()
     
     return None
@@ -900,47 +999,23 @@ async def get_chatbot_analytics(
     if not chatbot:
         raise HTTPException(status_code=404, detail="Chatbot not found")
     
-    # Count total conversations
-    total_conversations = session.exec(
-        select(func.count(Conversation.uuid))
+    # One statement: the conversation count as a subquery, message and feedback
+    # counts as FILTER aggregates over a single scan of the chatbot's messages
+    total_conversations, total_messages, total_thumbs_up, total_thumbs_down = session.exec(
+        select(
+            select(func.count())
+            .select_from(Conversation)
+            .where(Conversation.chatbot_uuid == chatbot_uuid)
+            .scalar_subquery(),
+            func.count(Message.id),
+            func.count(Message.id).filter(Message.feedback == "like"),
+            func.count(Message.id).filter(Message.feedback == "dislike"),
+        )
+        .select_from(Message)
+        .join(Conversation, Conversation.uuid == Message.conversation_uuid)
         .where(Conversation.chatbot_uuid == chatbot_uuid)
     ).one()
     
-    # Get all conversation UUIDs for this chatbot
-    conversation_uuids = session.exec(
-        select(Conversation.uuid)
-        .where(Conversation.chatbot_uuid == chatbot_uuid)
-    ).all()
-    
-    # Count total messages (all messages in conversations for this chatbot)
-    if conversation_uuids:
-        total_messages = session.exec(
-            select(func.count(Message.id))
-            .where(Message.conversation_uuid.in_(conversation_uuids))
-        ).one()
-        
-        # Count thumbs up (likes)
-        total_thumbs_up = session.exec(
-            select(func.count(Message.id))
-            .where(
-                Message.conversation_uuid.in_(conversation_uuids),
-                Message.feedback == "like"
-            )
-        ).one()
-        
-        # Count thumbs down (dislikes)
-        total_thumbs_down = session.exec(
-            select(func.count(Message.id))
-            .where(
-                Message.conversation_uuid.in_(conversation_uuids),
-                Message.feedback == "dislike"
-            )
-        ).one()
-    else:
-        total_messages = 0
-        total_thumbs_up = 0
-        total_thumbs_down = 0
-    
     return {
         "total_conversations": total_conversations or 0,
         "total_messages": total_messages or 0,
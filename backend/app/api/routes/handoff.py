@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import literal, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import raiseload
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
 from datetime import datetime, timezone
 
@@ -29,6 +32,21 @@ def serialize_datetime(dt):
     return iso_str
 
 
+def _last_message_content(conversation_uuid):
+    """Scalar subquery: content of the newest message of a conversation.
+
+    ``conversation_uuid`` may be a column of the enclosing query, so a whole
+    list is enriched in one statement instead of one lookup per row.
+    """
+    return (
+        select(Message.content)
+        .where(Message.conversation_uuid == conversation_uuid)
+        .order_by(Message.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
 # Schemas
 class HandoffRequestResponse(BaseModel):
     id: int
@@ -88,14 +106,10 @@ async def create_handoff_request(
         reason=request.reason,
         session=session
     )
+    await handoff_service.publish_handoff_status(request.conversation_uuid, "requested")
     
-    # Get conversation details for response
-    last_message = session.exec(
-        select(Message)
-        .where(Message.conversation_uuid == request.conversation_uuid)
-        .order_by(Message.created_at.desc())
-        .limit(1)
-    ).first()
+    # Only the content of the last message is returned
+    last_message = session.exec(select(_last_message_content(request.conversation_uuid))).one()
     
     response_data = {
         "id": handoff_request.id,
@@ -109,19 +123,36 @@ async def create_handoff_request(
         "reason": handoff_request.reason,
         "customer_name": conversation.customer_name,
         "customer_email": conversation.customer_email,
-        "last_message": last_message.content if last_message else None
+        "last_message": last_message
     }
     
     return response_data
 
 
+def _parse_handoff_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a ``<requested_at>,<id>`` cursor into a naive UTC timestamp and id"""
+    try:
+        requested_at, request_id = cursor.rsplit(",", 1)
+        dt = datetime.fromisoformat(requested_at)
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt, int(request_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/pending/{chatbot_uuid}", response_model=List[HandoffRequestResponse])
 async def get_pending_handoff_requests(
     chatbot_uuid: str,
+    cursor: Optional[str] = Query(
+        None,
+        description="Return requests older than this one, given as '<requested_at>,<id>' of the last request of the previous page",
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size; all pending requests when omitted"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    """Get all pending handoff requests for a chatbot"""
+    """Get pending handoff requests for a chatbot, newest first"""
     # Verify user has access to the chatbot's workspace
     chatbot = session.exec(
         select(Chatbot).where(Chatbot.uuid == chatbot_uuid)
@@ -136,52 +167,63 @@ async def get_pending_handoff_requests(
     except HTTPException:
         raise HTTPException(status_code=403, detail="Not authorized to view this chatbot's handoff requests")
     
-    # Get pending requests
-    requests = handoff_service.get_pending_handoff_requests(
-        chatbot_uuid=chatbot_uuid,
-        session=session
+    # Create the missing pending requests for conversations with handoff_status="requested"
+    # (fallback for race conditions) in one INSERT ... SELECT
+    created = session.exec(
+        insert(HandoffRequest)
+        .from_select(
+            ["conversation_uuid", "chatbot_uuid", "status", "requested_at", "reason"],
+            select(
+                Conversation.uuid,
+                Conversation.chatbot_uuid,
+                literal("pending"),
+                literal(datetime.utcnow()),
+                literal("Auto-created from conversation status"),
+            )
+            .where(Conversation.chatbot_uuid == chatbot_uuid)
+            .where(Conversation.handoff_status == "requested")
+            .where(
+                ~select(HandoffRequest.id)
+                .where(HandoffRequest.conversation_uuid == Conversation.uuid)
+                .where(HandoffRequest.status == "pending")
+                .exists()
+            ),
+        )
+        .on_conflict_do_nothing(
+            index_elements=["conversation_uuid"],
+            index_where=HandoffRequest.status == "pending",
+        )
+        .returning(HandoffRequest.conversation_uuid)
+    ).scalars().all()
+    if created:
+        session.commit()
+        for conversation_uuid in created:
+            await handoff_service.publish_handoff_status(conversation_uuid, "requested")
+    
+    # Pending requests with their conversation details and last message, in one query
+    query = (
+        select(
+            HandoffRequest,
+            Conversation.customer_name,
+            Conversation.customer_email,
+            _last_message_content(HandoffRequest.conversation_uuid).label("last_message"),
+        )
+        .outerjoin(Conversation, Conversation.uuid == HandoffRequest.conversation_uuid)
+        .where(HandoffRequest.chatbot_uuid == chatbot_uuid)
+        .where(HandoffRequest.status == "pending")
+        .order_by(HandoffRequest.requested_at.desc(), HandoffRequest.id.desc())
+        .options(raiseload("*"))
     )
+    if cursor:
+        query = query.where(
+            tuple_(HandoffRequest.requested_at, HandoffRequest.id) < _parse_handoff_cursor(cursor)
+        )
+    if limit:
+        query = query.limit(limit)
+    rows = session.exec(query).all()
     
-    # Also get conversations with handoff_status="requested" that might not have a handoff_request record yet
-    # (fallback for race conditions)
-    conversations_requested = session.exec(
-        select(Conversation)
-        .where(Conversation.chatbot_uuid == chatbot_uuid)
-        .where(Conversation.handoff_status == "requested")
-    ).all()
-    
-    # Create a set of conversation UUIDs that already have handoff requests
-    existing_conversation_uuids = {req.conversation_uuid for req in requests}
-    
-    # Add handoff requests for conversations that are requested but don't have a request record
-    for conv in conversations_requested:
-        if conv.uuid not in existing_conversation_uuids:
-            # Create a handoff request if it doesn't exist
-            try:
-                req = handoff_service.create_handoff_request(
-                    conversation_uuid=conv.uuid,
-                    chatbot_uuid=chatbot_uuid,
-                    reason="Auto-created from conversation status",
-                    session=session
-                )
-                requests.append(req)
-            except Exception as e:
-                print(f"Error creating handoff request for conversation {conv.uuid}: {e}")
-    
-    # Enrich with conversation details
     response_data = []
-    for req in requests:
-        conversation = session.exec(
-            select(Conversation).where(Conversation.uuid == req.conversation_uuid)
-        ).first()
-        
-        last_message = session.exec(
-            select(Message)
-            .where(Message.conversation_uuid == req.conversation_uuid)
-            .order_by(Message.created_at.desc())
-            .limit(1)
-        ).first()
-        
+    for req, customer_name, customer_email, last_message in rows:
         response_data.append({
             "id": req.id,
             "conversation_uuid": req.conversation_uuid,
@@ -192,14 +234,11 @@ async def get_pending_handoff_requests(
             "accepted_by_user_uuid": req.accepted_by_user_uuid,
             "resolved_at": serialize_datetime(req.resolved_at),
             "reason": req.reason,
-            "customer_name": conversation.customer_name if conversation else None,
-            "customer_email": conversation.customer_email if conversation else None,
-            "last_message": last_message.content if last_message else None
+            "customer_name": customer_name,
+            "customer_email": customer_email,
+            "last_message": last_message
         })
     
-    # Sort by requested_at descending
-    response_data.sort(key=lambda x: x["requested_at"], reverse=True)
-    
     return response_data
 
 
@@ -215,17 +254,15 @@ async def accept_handoff_request(
         user_uuid=current_user.uuid,
         session=session
     )
+    await handoff_service.publish_handoff_status(handoff_request.conversation_uuid, "human")
     
-    # Get conversation details
+    # Get conversation details and last message in one query
     conversation = session.exec(
-        select(Conversation).where(Conversation.uuid == handoff_request.conversation_uuid)
-    ).first()
-    
-    last_message = session.exec(
-        select(Message)
-        .where(Message.conversation_uuid == handoff_request.conversation_uuid)
-        .order_by(Message.created_at.desc())
-        .limit(1)
+        select(
+            Conversation.customer_name,
+            Conversation.customer_email,
+            _last_message_content(Conversation.uuid).label("last_message"),
+        ).where(Conversation.uuid == handoff_request.conversation_uuid)
     ).first()
     
     response_data = {
@@ -240,7 +277,7 @@ async def accept_handoff_request(
         "reason": handoff_request.reason,
         "customer_name": conversation.customer_name if conversation else None,
         "customer_email": conversation.customer_email if conversation else None,
-        "last_message": last_message.content if last_message else None
+        "last_message": conversation.last_message if conversation else None
     }
     
     return response_data
@@ -348,14 +385,10 @@ async def take_over_conversation(
             user_uuid=current_user.uuid,
             session=session
         )
+        await handoff_service.publish_handoff_status(request.conversation_uuid, "human")
     
-    # Get last message for response
-    last_message = session.exec(
-        select(Message)
-        .where(Message.conversation_uuid == request.conversation_uuid)
-        .order_by(Message.created_at.desc())
-        .limit(1)
-    ).first()
+    # Only the content of the last message is returned
+    last_message = session.exec(select(_last_message_content(request.conversation_uuid))).one()
     
     response_data = {
         "id": handoff_request.id,
@@ -369,7 +402,7 @@ async def take_over_conversation(
         "reason": handoff_request.reason,
         "customer_name": conversation.customer_name,
         "customer_email": conversation.customer_email,
-        "last_message": last_message.content if last_message else None
+        "last_message": last_message
     }
     
     return response_data
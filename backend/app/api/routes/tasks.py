@@ -2,6 +2,7 @@
 import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import raiseload
 from sqlmodel import Session, select
 from pydantic import BaseModel
 from app.database import get_session
@@ -84,6 +85,7 @@ async def get_task_by_resource(
             BackgroundTask.chatbot_uuid == chatbot_uuid
         )
         .order_by(BackgroundTask.created_at.desc())
+        .options(raiseload("*"))
     ).first()
     
     if not task:
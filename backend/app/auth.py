@@ -1,13 +1,17 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
 from app.models import User
 from app.database import get_session
+from app.services.cache_service import cache_service
 
 # Configuration - Load from environment variables
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -19,6 +23,19 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Shorter expiry for better security
 
 security = HTTPBearer()
 
+# Columns get_current_user may serve from the short-lived per-worker user cache.
+# Everything else (password hash, plan, credits) is expired on the attached
+# instance and reloaded from the database on first access.
+CACHED_USER_FIELDS = ("uuid", "username", "email", "is_active", "user_type", "created_at")
+UNCACHED_USER_FIELDS = ("hashed_password", "plan_id", "message_credits_remaining", "credits_reset_date", "subscription_status")
+
+# bcrypt releases the GIL while hashing, so a thread per core runs hashes in parallel
+# without blocking the event loop or competing with the request threadpool
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
 
 def hash_password(password: str) -> str:
     """
@@ -52,6 +69,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password executor, for use in async handlers."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password executor, for use in async handlers."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token with expiration.
@@ -117,13 +146,22 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = session.get(User, user_uuid)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    cached = cache_service.get_auth_user(user_uuid)
+    if cached is not None:
+        # Attach the cached identity to this request's session without a SELECT
+        detached = User(**cached)
+        make_transient_to_detached(detached)
+        user = session.merge(detached, load=False)
+        session.expire(user, UNCACHED_USER_FIELDS)
+    else:
+        user = session.get(User, user_uuid)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        cache_service.set_auth_user(user_uuid, {field: getattr(user, field) for field in CACHED_USER_FIELDS})
     
     if not user.is_active:
         raise HTTPException(
@@ -1,5 +1,9 @@
 import os
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, create_engine, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,29 +12,88 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable must be set")
 
+# Connection pool sizing per worker process. Keep
+# (pool_size + max_overflow) x engines x workers under PostgreSQL's
+# max_connections, or put PgBouncer (transaction pooling) in front.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "5"))  # Fail fast instead of queueing for 30s
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Sync pool for the threadpool routes and Celery. Overflow connections are
+# closed when returned, so keep the steady load inside pool_size.
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "20"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "10"))
+
 # Production-ready engine configuration
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Disable SQL logging in production
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Maximum overflow connections
-    pool_recycle=3600,  # Recycle connections after 1 hour
+    pool_size=DB_SYNC_POOL_SIZE,  # Connection pool size
+    max_overflow=DB_SYNC_MAX_OVERFLOW,  # Maximum overflow connections
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,  # Recycle connections before server/proxy idle timeouts
+)
+
+# Async engine for the I/O-bound API handlers, same database over asyncpg;
+# most request traffic goes through this pool
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
 )
 
 # SessionLocal for use in Celery tasks and other contexts
-# Creates a new session when called
-def SessionLocal():
-    """Create a new database session for use in Celery tasks"""
-    return Session(engine)
+# Creates a new session on the pooled sync engine when called
+SessionLocal = sessionmaker(engine, class_=Session)
 
 
 def get_session():
     """Dependency for database sessions with automatic cleanup"""
-    with Session(engine) as session:
+    with SessionLocal() as session:
+        yield session
+
+
+async def get_async_session():
+    """Async dependency for database sessions with automatic cleanup"""
+    async with AsyncSessionLocal() as session:
         yield session
 
 
+async def fetch_one(statement):
+    """Run a single-row statement on its own session.
+
+    Each call checks out its own pooled connection, so independent queries can
+    be awaited together with asyncio.gather.
+    """
+    async with AsyncSessionLocal() as session:
+        return (await session.exec(statement)).one()
+
+
+async def fetch_first(statement):
+    """Run a statement on its own session and return its first row, or None."""
+    async with AsyncSessionLocal() as session:
+        return (await session.exec(statement)).first()
+
+
+async def fetch_all(statement):
+    """Run a statement on its own session and return every row."""
+    async with AsyncSessionLocal() as session:
+        return (await session.exec(statement)).all()
+
+
 def create_db_and_tables():
     """Create all database tables"""
     SQLModel.metadata.create_all(engine)
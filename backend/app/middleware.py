@@ -0,0 +1,33 @@
+"""ASGI middleware shared by the API application."""
+import re
+from typing import Sequence
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PublicCORSMiddleware:
+    """CORS for the API with an open policy on public widget endpoints.
+
+    Requests whose path matches one of ``public_paths`` (full-match regexes)
+    are handled by a CORSMiddleware that allows any origin, so widgets
+    embedded on customer sites get proper preflight responses. Every other
+    request goes through a CORSMiddleware built from ``cors_options``.
+    """
+
+    def __init__(self, app: ASGIApp, public_paths: Sequence[str], **cors_options) -> None:
+        self.public_paths = [re.compile(path) for path in public_paths]
+        self.public_cors = CORSMiddleware(
+            app,
+            allow_origins=["*"],
+            allow_methods=["GET", "POST", "OPTIONS"],
+            allow_headers=["*"],
+            max_age=3600,
+        )
+        self.cors = CORSMiddleware(app, **cors_options)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and any(path.fullmatch(scope["path"]) for path in self.public_paths):
+            await self.public_cors(scope, receive, send)
+        else:
+            await self.cors(scope, receive, send)
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, Relationship
 import uuid
 
@@ -40,7 +41,7 @@ class User(SQLModel, table=True):
     credits_reset_date: Optional[datetime] = Field(default=None)  # None if no plan
     subscription_status: str = Field(default="active", max_length=20)  # active, cancelled, expired
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     
     plan: Plan = Relationship(back_populates="users")
     chatbots: List["Chatbot"] = Relationship(back_populates="user")
@@ -53,7 +54,7 @@ class Workspace(SQLModel, table=True):
     __tablename__ = "workspaces"
     
     uuid: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    name: str = Field(max_length=100, index=True)
+    name: str = Field(max_length=100)
     description: Optional[str] = None
     owner_uuid: str = Field(foreign_key="users.uuid", index=True)  # Workspace creator/owner
     # Credits come from owner's plan, not stored here
@@ -82,10 +83,19 @@ class WorkspaceMember(SQLModel, table=True):
 
 class WorkspaceInvitation(SQLModel, table=True):
     __tablename__ = "workspace_invitations"
+    __table_args__ = (
+        Index(
+            "uq_workspace_invitations_pending",
+            "workspace_uuid",
+            "email",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     workspace_uuid: str = Field(foreign_key="workspaces.uuid", index=True)
-    email: str = Field(max_length=255, index=True)
+    email: str = Field(max_length=255)
     invited_by_uuid: str = Field(foreign_key="users.uuid", index=True)
     token: str = Field(unique=True, index=True, max_length=255)  # Unique invitation token
     status: str = Field(default="pending", max_length=20)  # pending, accepted, expired
@@ -184,9 +194,17 @@ class WebsiteLink(SQLModel, table=True):
 
 class Conversation(SQLModel, table=True):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_created_at_client_uuid", "created_at", "client_uuid"),
+        Index("ix_conversations_chatbot_uuid_uuid", "chatbot_uuid", "uuid"),
+        # Conversation listings: newest first per chatbot, optionally per status or client
+        Index("ix_conversations_chatbot_uuid_updated_at", "chatbot_uuid", "updated_at"),
+        Index("ix_conversations_chatbot_uuid_status_updated_at", "chatbot_uuid", "status", "updated_at"),
+        Index("ix_conversations_chatbot_uuid_client_uuid_updated_at", "chatbot_uuid", "client_uuid", "updated_at"),
+    )
     
     uuid: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    chatbot_uuid: str = Field(foreign_key="chatbots.uuid", index=True)
+    chatbot_uuid: str = Field(foreign_key="chatbots.uuid")  # Indexed as the prefix of the listing composites
     customer_name: Optional[str] = Field(default="Anonymous", max_length=100)
     customer_email: Optional[str] = Field(max_length=255)
     customer_phone: Optional[str] = Field(max_length=50)
@@ -205,13 +223,25 @@ class Conversation(SQLModel, table=True):
 
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Topic drill-down: user questions of a topic, newest first
+        Index("ix_messages_conversation_uuid_role_topic_created_at", "conversation_uuid", "role", "topic", "created_at"),
+        # First/last message previews of a conversation
+        Index("ix_messages_conversation_uuid_created_at", "conversation_uuid", "created_at"),
+        Index(
+            "ix_messages_conversation_uuid_created_at_user",
+            "conversation_uuid",
+            "created_at",
+            postgresql_where=text("role = 'user'"),
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    conversation_uuid: str = Field(foreign_key="conversations.uuid", index=True)
+    conversation_uuid: str = Field(foreign_key="conversations.uuid")  # Indexed as the prefix of the composites above
     role: str = Field(max_length=20)  # "user", "assistant", or "agent"
     content: str
     feedback: Optional[str] = Field(default=None, max_length=10)  # "like", "dislike", or None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
     topic: Optional[str] = Field(default=None, max_length=100, index=True)
     
     conversation: Conversation = Relationship(back_populates="messages")
@@ -221,9 +251,12 @@ class TopicStat(SQLModel, table=True):
     """Aggregated topic statistics per chatbot for fast analytics."""
 
     __tablename__ = "topic_stats"
+    __table_args__ = (
+        Index("ix_topic_stats_chatbot_uuid_topic", "chatbot_uuid", "topic"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    chatbot_uuid: str = Field(foreign_key="chatbots.uuid", index=True)
+    chatbot_uuid: str = Field(foreign_key="chatbots.uuid")
     topic: str = Field(max_length=100, index=True)
     message_count: int = Field(default=0)
     updated_at: datetime = Field(
@@ -233,16 +266,54 @@ class TopicStat(SQLModel, table=True):
     chatbot: Chatbot = Relationship()
 
 
+class TopicQuestionGroupCache(SQLModel, table=True):
+    """Last grouping of a topic's newest questions, reused until the topic's questions change."""
+
+    __tablename__ = "topic_question_group_cache"
+    __table_args__ = (
+        Index("ix_topic_question_group_cache_chatbot_uuid_topic", "chatbot_uuid", "topic", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    chatbot_uuid: str = Field(foreign_key="chatbots.uuid", ondelete="CASCADE")
+    topic: str = Field(max_length=100)
+    # Version of the grouped data: the request's question cap plus the topic's
+    # newest message id and user message count when the grouping was computed
+    question_limit: int
+    last_message_id: int
+    message_count: int
+    payload: str  # Serialized TopicQuestionsResponse
+    # Unit centroid of each group as float32 rows, in payload order
+    centroids: Optional[bytes] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class HandoffRequest(SQLModel, table=True):
     __tablename__ = "handoff_requests"
+    __table_args__ = (
+        # Pending listing, newest first, with a (requested_at, id) keyset
+        Index("ix_handoff_requests_chatbot_uuid_status_requested_at", "chatbot_uuid", "status", "requested_at", "id"),
+        Index(
+            "ix_handoff_requests_accepted_user_open",
+            "accepted_by_user_uuid",
+            postgresql_where=text("status IN ('pending', 'accepted')"),
+        ),
+        # At most one pending request per conversation
+        Index(
+            "uq_handoff_requests_conversation_uuid_pending",
+            "conversation_uuid",
+            unique=True,
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     conversation_uuid: str = Field(foreign_key="conversations.uuid", index=True)
-    chatbot_uuid: str = Field(foreign_key="chatbots.uuid", index=True)
+    chatbot_uuid: str = Field(foreign_key="chatbots.uuid")
     status: str = Field(default="pending", max_length=20)  # pending, accepted, resolved
     requested_at: datetime = Field(default_factory=datetime.utcnow)
     accepted_at: Optional[datetime] = None
-    accepted_by_user_uuid: Optional[str] = Field(default=None, foreign_key="users.uuid", index=True)
+    accepted_by_user_uuid: Optional[str] = Field(default=None, foreign_key="users.uuid")
     resolved_at: Optional[datetime] = None
     reason: Optional[str] = None  # Why handoff was requested
     
@@ -273,17 +344,20 @@ class Ticket(SQLModel, table=True):
 
 class BackgroundTask(SQLModel, table=True):
     __tablename__ = "background_tasks"
+    __table_args__ = (
+        Index("ix_background_tasks_chatbot_resource", "chatbot_uuid", "resource_type", "resource_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     task_id: str = Field(unique=True, index=True, max_length=255)  # Celery task ID
-    task_type: str = Field(max_length=50, index=True)  # "document_processing", "website_crawling", etc.
-    status: str = Field(default="pending", max_length=20, index=True)  # pending, processing, completed, failed
+    task_type: str = Field(max_length=50)  # "document_processing", "website_crawling", etc.
+    status: str = Field(default="pending", max_length=20)  # pending, processing, completed, failed
     progress: int = Field(default=0)  # 0-100 percentage
     result_data: Optional[str] = None  # JSON string with result data
     error_message: Optional[str] = None
     resource_type: str = Field(max_length=50)  # "document", "website_link", etc.
-    resource_id: int = Field(index=True)  # ID of the document, website_link, etc.
-    chatbot_uuid: str = Field(foreign_key="chatbots.uuid", index=True)
+    resource_id: int  # ID of the document, website_link, etc.
+    chatbot_uuid: str = Field(foreign_key="chatbots.uuid")
     user_uuid: str = Field(foreign_key="users.uuid", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
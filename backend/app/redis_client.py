@@ -0,0 +1,13 @@
+"""Redis clients for API-side caching."""
+import os
+import redis
+import redis.asyncio
+
+# Get Redis URL from environment or use default
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Connections are opened lazily from each client's pool on first use.
+# The async client serves async handlers; the sync one is for sync handlers
+# running in the threadpool.
+redis_client = redis.asyncio.Redis.from_url(REDIS_URL)
+sync_redis_client = redis.Redis.from_url(REDIS_URL)
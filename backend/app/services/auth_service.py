@@ -1,24 +1,25 @@
 from typing import Optional
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User
 from app.schemas import UserCreate, LoginRequest
-from app.auth import hash_password, verify_password, create_access_token
+from app.auth import hash_password_async, verify_password_async, create_access_token
 
 
 class AuthService:
     """Service layer for authentication and user management"""
     
     @staticmethod
-    def register_user(user_data: UserCreate, session: Session) -> User:
+    async def register_user(user_data: UserCreate, session: AsyncSession) -> User:
         """
         Register a new user.
         Validates uniqueness and creates user account.
         """
         # Check if username or email already exists
-        existing_user = session.exec(
+        existing_user = (await session.exec(
             select(User).where((User.username == user_data.username) | (User.email == user_data.email))
-        ).first()
+        )).first()
         
         if existing_user:
             raise HTTPException(
@@ -32,20 +33,20 @@ class AuthService:
         db_user = User(
             username=user_data.username,
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             plan_id=1,  # Basic plan
             message_credits_remaining=50,  # Basic plan credits
             credits_reset_date=datetime.utcnow() + timedelta(days=30)
         )
         
         session.add(db_user)
-        session.commit()
-        session.refresh(db_user)
+        await session.commit()
+        await session.refresh(db_user)
         
         return db_user
     
     @staticmethod
-    def authenticate_user(login_data: LoginRequest, session: Session) -> dict:
+    async def authenticate_user(login_data: LoginRequest, session: AsyncSession) -> dict:
         """
         Authenticate user and return JWT token.
         Validates credentials and account status.
@@ -53,12 +54,12 @@ class AuthService:
         from datetime import timedelta
         
         # Find user by email
-        user = session.exec(
+        user = (await session.exec(
             select(User).where(User.email == login_data.email)
-        ).first()
+        )).first()
         
         # Verify user exists and password is correct
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        if not user or not await verify_password_async(login_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
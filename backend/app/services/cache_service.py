@@ -0,0 +1,265 @@
+"""In-process TTL caches for data that is read far more often than it changes."""
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from app.redis_client import redis_client, sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+PLANS_TTL_SECONDS = 300
+PUBLIC_CHATBOT_TTL_SECONDS = 60
+PUBLIC_CHATBOT_REDIS_TTL_SECONDS = 300
+CHATBOT_STATUS_TTL_SECONDS = 300
+AUTH_USER_TTL_SECONDS = 30
+EMBEDDING_TTL_SECONDS = 30 * 24 * 3600
+CONVERSATION_COUNT_TTL_SECONDS = 60
+RESPONSE_CACHE_TTL_SECONDS = 24 * 3600
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+
+class CacheService:
+    """Per-worker caches for plans, public chatbot widget info and authenticated users.
+
+    Entries are invalidated only in the worker that handled the write; the TTL
+    bounds how long other workers may keep serving the previous value.
+    Public chatbot payloads, chatbot status, text embeddings, conversation
+    counts and cached chat answers are also shared across workers through Redis.
+    """
+
+    def __init__(self):
+        # Invalidation runs from sync handlers in the threadpool, reads from the event loop
+        self._lock = threading.Lock()
+        self._plans = TTLCache(maxsize=64, ttl=PLANS_TTL_SECONDS)
+        self._public_chatbots = TTLCache(maxsize=10_000, ttl=PUBLIC_CHATBOT_TTL_SECONDS)
+        self._auth_users = TTLCache(maxsize=10_000, ttl=AUTH_USER_TTL_SECONDS)
+
+    def get_plans(self, key: Any) -> Optional[Any]:
+        """Get a cached plan lookup (the active plan list or a single plan)."""
+        with self._lock:
+            return self._plans.get(key)
+
+    def set_plans(self, key: Any, value: Any) -> None:
+        """Cache a plan lookup."""
+        with self._lock:
+            self._plans[key] = value
+
+    def invalidate_plans(self) -> None:
+        """Drop every cached plan lookup."""
+        with self._lock:
+            self._plans.clear()
+
+    @staticmethod
+    def _public_chatbot_key(chatbot_uuid: str) -> str:
+        return f"chatbot:public:{chatbot_uuid}"
+
+    async def get_public_chatbot(self, chatbot_uuid: str) -> Optional[Tuple[bytes, str]]:
+        """Get the cached public widget JSON body and its ETag for a chatbot.
+
+        Checks this worker's cache first, then Redis. Redis errors are logged
+        and treated as a miss so the widget keeps working without Redis.
+        """
+        with self._lock:
+            entry = self._public_chatbots.get(chatbot_uuid)
+        if entry is not None:
+            return entry
+
+        try:
+            body = await redis_client.get(self._public_chatbot_key(chatbot_uuid))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for public chatbot cache: {e}")
+            return None
+        if body is None:
+            return None
+
+        entry = (body, self._etag(body))
+        with self._lock:
+            self._public_chatbots[chatbot_uuid] = entry
+        return entry
+
+    async def set_public_chatbot(self, chatbot_uuid: str, body: bytes) -> Tuple[bytes, str]:
+        """Cache the public widget JSON body for a chatbot and return it with its ETag."""
+        entry = (body, self._etag(body))
+        with self._lock:
+            self._public_chatbots[chatbot_uuid] = entry
+        try:
+            await redis_client.set(
+                self._public_chatbot_key(chatbot_uuid), body, ex=PUBLIC_CHATBOT_REDIS_TTL_SECONDS
+            )
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for public chatbot cache: {e}")
+        return entry
+
+    @staticmethod
+    def _chatbot_status_key(chatbot_uuid: str) -> str:
+        return f"chatbot:status:{chatbot_uuid}"
+
+    async def get_chatbot_status(self, chatbot_uuid: str) -> Optional[dict]:
+        """Get the cached status fields (is_active, workspace_uuid) of a chatbot.
+
+        Used by the chat endpoints to validate a chatbot without a database
+        round-trip. Redis errors are logged and treated as a miss.
+        """
+        try:
+            cached = await redis_client.get(self._chatbot_status_key(chatbot_uuid))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for chatbot status cache: {e}")
+            return None
+        return orjson.loads(cached) if cached is not None else None
+
+    async def set_chatbot_status(self, chatbot_uuid: str, fields: dict) -> None:
+        """Cache the status fields of a chatbot."""
+        try:
+            await redis_client.set(
+                self._chatbot_status_key(chatbot_uuid), orjson.dumps(fields), ex=CHATBOT_STATUS_TTL_SECONDS
+            )
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for chatbot status cache: {e}")
+
+    def invalidate_chatbot(self, chatbot_uuid: str) -> None:
+        """Drop the cached public widget payload, status and answers after the chatbot changes."""
+        with self._lock:
+            self._public_chatbots.pop(chatbot_uuid, None)
+        try:
+            sync_redis_client.delete(
+                self._public_chatbot_key(chatbot_uuid),
+                self._chatbot_status_key(chatbot_uuid),
+                *self._response_keys(chatbot_uuid),
+            )
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for chatbot cache: {e}")
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def get_auth_user(self, user_uuid: str) -> Optional[dict]:
+        """Get the cached identity columns of an authenticated user."""
+        with self._lock:
+            return self._auth_users.get(user_uuid)
+
+    def set_auth_user(self, user_uuid: str, fields: dict) -> None:
+        """Cache the identity columns of an authenticated user."""
+        with self._lock:
+            self._auth_users[user_uuid] = fields
+
+    def invalidate_auth_user(self, user_uuid: str) -> None:
+        """Drop a cached user after their profile or password changes."""
+        with self._lock:
+            self._auth_users.pop(user_uuid, None)
+
+    @staticmethod
+    def _embedding_key(model: str, text: str) -> str:
+        return f"embedding:{model}:{hashlib.sha256(text.encode()).hexdigest()}"
+
+    async def get_embeddings(self, model: str, texts: List[str]) -> List[Optional[bytes]]:
+        """Get cached embedding vectors (raw bytes) for texts, None where missing.
+
+        Keys are content hashes, so identical texts share an entry across chatbots
+        and topics. Redis errors are logged and treated as misses.
+        """
+        if not texts:
+            return []
+        try:
+            return await redis_client.mget([self._embedding_key(model, text) for text in texts])
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for embedding cache: {e}")
+            return [None] * len(texts)
+
+    async def set_embeddings(self, model: str, vectors: Dict[str, bytes]) -> None:
+        """Cache embedding vectors (raw bytes) keyed by their text."""
+        if not vectors:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for text, vector in vectors.items():
+                    pipe.set(self._embedding_key(model, text), vector, ex=EMBEDDING_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for embedding cache: {e}")
+
+    @staticmethod
+    def _conversation_count_key(chatbot_uuid: str, scope: str) -> str:
+        return f"conversations:count:{chatbot_uuid}:{scope}"
+
+    async def get_conversation_count(self, chatbot_uuid: str, scope: str) -> Optional[int]:
+        """Get a cached conversation count for a chatbot listing.
+
+        ``scope`` identifies the listing filters. Counts are not invalidated on
+        writes; they expire after a short TTL so repeated dashboard polls don't
+        re-count the table.
+        """
+        try:
+            count = await redis_client.get(self._conversation_count_key(chatbot_uuid, scope))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for conversation count cache: {e}")
+            return None
+        return int(count) if count is not None else None
+
+    async def set_conversation_count(self, chatbot_uuid: str, scope: str, count: int) -> None:
+        """Cache a conversation count for a chatbot listing."""
+        try:
+            await redis_client.set(
+                self._conversation_count_key(chatbot_uuid, scope), count, ex=CONVERSATION_COUNT_TTL_SECONDS
+            )
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for conversation count cache: {e}")
+
+    @staticmethod
+    def _response_keys(chatbot_uuid: str) -> Tuple[str, str]:
+        # Question embeddings and answers live in two hashes sharing field ids,
+        # so a lookup only transfers the answer it picks
+        return f"responses:{chatbot_uuid}:vectors", f"responses:{chatbot_uuid}:answers"
+
+    async def get_response_vectors(self, chatbot_uuid: str) -> Dict[str, bytes]:
+        """Get the question embeddings (raw bytes) of a chatbot's cached answers, by entry id."""
+        try:
+            entries = await redis_client.hgetall(self._response_keys(chatbot_uuid)[0])
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for response cache: {e}")
+            return {}
+        return {field.decode(): vector for field, vector in entries.items()}
+
+    async def get_response(self, chatbot_uuid: str, entry_id: str) -> Optional[str]:
+        """Get a cached answer by entry id."""
+        try:
+            answer = await redis_client.hget(self._response_keys(chatbot_uuid)[1], entry_id)
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for response cache: {e}")
+            return None
+        return answer.decode() if answer is not None else None
+
+    async def set_response(self, chatbot_uuid: str, entry_id: str, vector: bytes, answer: str) -> None:
+        """Cache an answer with the embedding of its question.
+
+        Each chatbot keeps at most RESPONSE_CACHE_MAX_ENTRIES answers; once full,
+        new answers are not cached until the entries expire or are invalidated.
+        """
+        vectors_key, answers_key = self._response_keys(chatbot_uuid)
+        try:
+            if await redis_client.hlen(vectors_key) >= RESPONSE_CACHE_MAX_ENTRIES:
+                return
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(vectors_key, entry_id, vector)
+                pipe.hset(answers_key, entry_id, answer)
+                pipe.expire(vectors_key, RESPONSE_CACHE_TTL_SECONDS)
+                pipe.expire(answers_key, RESPONSE_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for response cache: {e}")
+
+    def invalidate_responses(self, chatbot_uuid: str) -> None:
+        """Drop a chatbot's cached answers after its knowledge base changes."""
+        try:
+            sync_redis_client.delete(*self._response_keys(chatbot_uuid))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for response cache: {e}")
+
+
+cache_service = CacheService()
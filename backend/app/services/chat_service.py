@@ -1,4 +1,4 @@
-from typing import TypedDict, Annotated, Sequence, Callable, Awaitable
+from typing import TypedDict, Annotated, Sequence, Callable, Awaitable, Dict, List, Optional, Tuple
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
@@ -9,8 +9,12 @@ from sqlmodel import Session, select
 from app.models import Chatbot, Conversation, Message, User
 from app.services.credits_service import credits_service
 from app.services.conversation_details_service import conversation_details_service
+from app.services.cache_service import cache_service
 from datetime import datetime
 from pydantic import BaseModel, Field
+import asyncio
+import hashlib
+import numpy as np
 import os
 import json
 import re
@@ -18,6 +22,13 @@ from app.celery_app import celery_app
 from starlette.concurrency import run_in_threadpool
 
 
+# Cosine similarity above which a cached answer is reused for a new question
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))
+# Cached answers are replayed to the client in pieces, like a live stream
+RESPONSE_REPLAY_CHARS = 160
+RESPONSE_REPLAY_DELAY_SECONDS = 0.02
+
+
 class ChatState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], "The messages in the conversation"]
     context: str
@@ -95,6 +106,13 @@ Be strict - only return true for explicit requests, not implied ones."""
         chatbot_uuid = state["chatbot_config"]["uuid"]
         user_query = state["messages"][-1].content
         
+        query_embedding = await self.embeddings.aembed_query(user_query)
+        state["context"] = await self._retrieve_context_by_vector(chatbot_uuid, query_embedding)
+        
+        return state
+    
+    async def _retrieve_context_by_vector(self, chatbot_uuid: str, query_embedding: List[float]) -> str:
+        """Retrieve relevant context from Pinecone for an already embedded query"""
         # Get vector store for this specific chatbot
         vector_store = PineconeVectorStore(
             index=self.index,
@@ -105,16 +123,64 @@ Be strict - only return true for explicit requests, not implied ones."""
         # Retrieve relevant documents.
         # Pinecone / LangChain vector stores are synchronous, so run in a thread
         docs = await run_in_threadpool(
-            vector_store.similarity_search,
-            user_query,
+            vector_store.similarity_search_by_vector,
+            query_embedding,
             k=5,
         )
         
         # Combine retrieved context
-        context = "\n\n".join([doc.page_content for doc in docs])
-        state["context"] = context
+        return "\n\n".join([doc.page_content for doc in docs])
+    
+    async def _find_cached_response(self, chatbot_uuid: str, query_embedding: List[float]) -> Optional[str]:
+        """Return a cached answer to a question similar enough to this one, if any."""
+        entries = await cache_service.get_response_vectors(chatbot_uuid)
+        if not entries:
+            return None
+        # Scoring a few hundred vectors takes milliseconds: keep it off the event loop
+        entry_id = await run_in_threadpool(self._best_cached_entry, entries, query_embedding)
+        if entry_id is None:
+            return None
+        return await cache_service.get_response(chatbot_uuid, entry_id)
+    
+    @staticmethod
+    def _best_cached_entry(entries: Dict[str, bytes], query_embedding: List[float]) -> Optional[str]:
+        """Id of the cached question most similar to the query, if similar enough."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        # Entries stored under another embedding size can't be compared
+        entry_ids = [entry_id for entry_id, vector in entries.items() if len(vector) == query.size]
+        if not entry_ids:
+            return None
         
-        return state
+        vectors = np.frombuffer(b"".join(entries[entry_id] for entry_id in entry_ids), dtype=np.int8)
+        vectors = vectors.reshape(len(entry_ids), query.size).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        scores = vectors @ (query / np.linalg.norm(query))
+        
+        best = int(np.argmax(scores))
+        if scores[best] < RESPONSE_CACHE_SIMILARITY:
+            return None
+        return entry_ids[best]
+    
+    async def _cache_response(self, chatbot_uuid: str, user_message: str, query_embedding: List[float], response: str) -> None:
+        """Cache an answer with its question embedding (int8, scaled to the row's max)."""
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        scale = 127.0 / max(float(np.abs(vector).max()), 1e-12)
+        quantized = np.round(vector * scale).astype(np.int8)
+        await cache_service.set_response(
+            chatbot_uuid, self._response_entry_id(user_message), quantized.tobytes(), response
+        )
+    
+    @staticmethod
+    def _response_entry_id(user_message: str) -> str:
+        """Cache entry id of a question: hash of its normalized text, so repeats match exactly."""
+        return hashlib.blake2b(user_message.strip().lower().encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    async def _replay_response(response: str, on_chunk: Callable[[str], Awaitable[None]]) -> None:
+        """Send a cached answer to `on_chunk` in pieces, paced like a live stream."""
+        for start in range(0, len(response), RESPONSE_REPLAY_CHARS):
+            await on_chunk(response[start:start + RESPONSE_REPLAY_CHARS])
+            await asyncio.sleep(RESPONSE_REPLAY_DELAY_SECONDS)
     
     def _build_system_prompt(self, chatbot_config: dict, context: str) -> str:
         """Build the system prompt used for both streaming and non-streaming generation."""
@@ -341,8 +407,8 @@ Be strict - only return true for explicit requests, not implied ones."""
         conversation_uuid: str,
         user_message: str,
         session: Session
-    ) -> str:
-        """Process a user message and return AI response (non-streaming).
+    ) -> dict:
+        """Process a user message and return the saved AI response message as a dict (non-streaming).
 
         Used by the REST endpoint. For streaming over WebSocket, use `stream_message`.
         """
@@ -389,6 +455,14 @@ Be strict - only return true for explicit requests, not implied ones."""
         )
         session.add(ai_msg)
         
+        # Update conversation timestamp
+        conversation.updated_at = datetime.utcnow()
+        session.add(conversation)
+        
+        # Build the response from the INSERT; reading the message after commit would reload the row
+        session.flush()
+        response = ai_msg.model_dump()
+        
         # If handoff should be offered (either by AI or user request), create handoff request
         if should_offer_handoff:
             from app.services.handoff_service import handoff_service
@@ -402,18 +476,15 @@ Be strict - only return true for explicit requests, not implied ones."""
                     session=session
                 )
                 print(f"[ChatService] ✅ Handoff request created: {handoff_request.id}")
+                await handoff_service.publish_handoff_status(conversation_uuid, "requested")
             except Exception as e:
                 print(f"[ChatService] ❌ Error creating handoff request: {e}")
                 import traceback
                 traceback.print_exc()
         
-        # Update conversation timestamp
-        conversation.updated_at = datetime.utcnow()
-        session.add(conversation)
-        
         session.commit()
         
-        return ai_response
+        return response
 
     async def stream_message(
         self,
@@ -422,12 +493,19 @@ Be strict - only return true for explicit requests, not implied ones."""
         user_message: str,
         session: Session,
         on_chunk: Callable[[str], Awaitable[None]],
-    ) -> str:
+    ) -> Tuple[str, int]:
         """Process a user message and stream the AI response incrementally.
 
         - Uses the same RAG + prompt construction as `process_message`
         - Streams tokens to `on_chunk` callback as they arrive
-        - Persists the full assistant message at the end
+        - Persists the full assistant message at the end and returns the
+          response with the id of that message
+
+        Answers to the first message of a conversation are cached per chatbot and
+        reused for the same question (by normalized text) or a similar one (by
+        embedding similarity) instead of calling the LLM. Later turns depend on
+        the conversation history and are never cached, nor are first messages
+        that contain the customer's contact details or name.
         """
         _, conversation, lc_messages, chatbot_config = self._prepare_chat_run(
             chatbot_uuid=chatbot_uuid,
@@ -436,38 +514,52 @@ Be strict - only return true for explicit requests, not implied ones."""
             session=session,
         )
 
-        # Retrieve context first (RAG)
-        initial_state: ChatState = {
-            "messages": lc_messages,
-            "context": "",
-            "chatbot_config": chatbot_config,
-            "should_offer_handoff": False,
-        }
-        state_with_context = await self._retrieve_context(initial_state)
-        context = state_with_context.get("context", "")
+        use_response_cache = (
+            len(lc_messages) == 1
+            and not conversation_details_service.mentions_customer_details(conversation, user_message)
+        )
+        full_response = None
+        if use_response_cache:
+            # Exact repeats are found by text hash, without embedding the question
+            full_response = await cache_service.get_response(chatbot_uuid, self._response_entry_id(user_message))
+
+        if full_response is None:
+            # Embed the question once: the response cache and the RAG lookup share it
+            query_embedding = await self.embeddings.aembed_query(user_message)
+            if use_response_cache:
+                full_response = await self._find_cached_response(chatbot_uuid, query_embedding)
+
+        if full_response is not None:
+            await self._replay_response(full_response, on_chunk)
+        else:
+            # Retrieve context first (RAG)
+            context = await self._retrieve_context_by_vector(chatbot_uuid, query_embedding)
 
-        system_prompt = self._build_system_prompt(chatbot_config, context)
+            system_prompt = self._build_system_prompt(chatbot_config, context)
 
-        # Initialize LLM for streaming (no structured output here; we just stream text)
-        llm = ChatOpenAI(
-            model=chatbot_config["model_name"],
-            temperature=0.7,
-            openai_api_key=self.openai_api_key,
-        )
+            # Initialize LLM for streaming (no structured output here; we just stream text)
+            llm = ChatOpenAI(
+                model=chatbot_config["model_name"],
+                temperature=0.7,
+                openai_api_key=self.openai_api_key,
+            )
+
+            messages = [HumanMessage(content=system_prompt)] + list(lc_messages)
 
-        messages = [HumanMessage(content=system_prompt)] + list(lc_messages)
+            full_response = ""
 
-        full_response = ""
+            async for chunk in llm.astream(messages):
+                # LangChain ChatOpenAI streaming yields chunks with `.content`
+                delta = getattr(chunk, "content", None) or ""
+                if not delta:
+                    continue
 
-        async for chunk in llm.astream(messages):
-            # LangChain ChatOpenAI streaming yields chunks with `.content`
-            delta = getattr(chunk, "content", None) or ""
-            if not delta:
-                continue
+                full_response += delta
+                # Send incremental chunk to the caller (e.g., WebSocket)
+                await on_chunk(delta)
 
-            full_response += delta
-            # Send incremental chunk to the caller (e.g., WebSocket)
-            await on_chunk(delta)
+            if use_response_cache and full_response:
+                await self._cache_response(chatbot_uuid, user_message, query_embedding, full_response)
 
         # After streaming completes, persist the assistant message
         ai_msg = Message(
@@ -481,9 +573,12 @@ Be strict - only return true for explicit requests, not implied ones."""
         conversation.updated_at = datetime.utcnow()
         session.add(conversation)
 
+        # The id comes back from the INSERT; reading it after commit would reload the row
+        session.flush()
+        assistant_message_id = ai_msg.id
         session.commit()
 
-        return full_response
+        return full_response, assistant_message_id
     
     def create_conversation(
         self,
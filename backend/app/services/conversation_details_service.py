@@ -133,6 +133,19 @@ Examples:
             session.commit()
         
         return updated
+    
+    @staticmethod
+    def mentions_customer_details(conversation: Conversation, message_text: str) -> bool:
+        """
+        Whether the message contains the customer's email, phone number or name.
+        Call after update_conversation_details, so a name given in the message is known.
+        """
+        if ConversationDetailsService.extract_email(message_text):
+            return True
+        if ConversationDetailsService.extract_phone(message_text):
+            return True
+        name = conversation.customer_name
+        return bool(name) and name != "Anonymous" and name.lower() in message_text.lower()
 
 
 conversation_details_service = ConversationDetailsService()
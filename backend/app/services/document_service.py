@@ -5,6 +5,7 @@ from fastapi import UploadFile, HTTPException, status
 from sqlmodel import Session, select
 from app.models import Document, Chatbot, User
 from app.services.pinecone_service import PineconeService
+from app.services.cache_service import cache_service
 from app.services.file_processor import FileProcessor
 
 logger = logging.getLogger(__name__)
@@ -305,6 +306,7 @@ async def process_document_content(
                 vectors=batch,
                 namespace=chatbot_uuid
             )
+        cache_service.invalidate_responses(chatbot_uuid)
         
         logger.info(f"Successfully processed {len(chunks)} chunks for {source_type} {source_id}")
         return len(chunks)
@@ -0,0 +1,78 @@
+"""Per-worker Redis subscription delivering handoff status changes to chat sockets."""
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from app.redis_client import redis_client
+from app.services.handoff_service import handoff_channel
+
+logger = logging.getLogger(__name__)
+
+
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+class HandoffListener:
+    """One Redis pattern subscription per worker for every conversation's handoff channel.
+
+    Chat sockets register a state dict for their conversation, and each status
+    published on that conversation's channel is written to its
+    ``state["handoff_status"]``. ``generation`` changes whenever the subscription
+    is (re)established; while ``live`` is False, or after the generation changed,
+    updates may have been missed and sockets should read the status from the
+    database instead.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, List[dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.live = False
+        self.generation = 0
+
+    def watch(self, conversation_uuid: str, state: dict) -> None:
+        """Route the conversation's status changes into ``state``, starting the subscription if needed."""
+        self._states.setdefault(conversation_uuid, []).append(state)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    def unwatch(self, conversation_uuid: str, state: dict) -> None:
+        """Stop routing status changes into ``state``."""
+        states = self._states.get(conversation_uuid)
+        if states is None:
+            return
+        states[:] = [watched for watched in states if watched is not state]
+        if not states:
+            del self._states[conversation_uuid]
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(handoff_channel("*"))
+                self.generation += 1
+                self.live = True
+                async for message in pubsub.listen():
+                    conversation_uuid = message["channel"].decode().partition(":")[2]
+                    for state in self._states.get(conversation_uuid, ()):
+                        state["handoff_status"] = message["data"].decode()
+            except RedisError as e:
+                logger.warning(f"Redis unavailable for handoff status updates: {e}")
+            finally:
+                self.live = False
+                with suppress(RedisError):
+                    await pubsub.aclose()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def close(self) -> None:
+        """Stop the subscription (on shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+handoff_listener = HandoffListener()
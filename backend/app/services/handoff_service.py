@@ -1,12 +1,43 @@
+import logging
 from datetime import datetime
 from typing import Optional
+from redis.exceptions import RedisError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import raiseload
 from sqlmodel import Session, select
 from app.models import HandoffRequest, Conversation, Chatbot, User, Message
+from app.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def handoff_channel(conversation_uuid: str) -> str:
+    """Redis pub/sub channel announcing a conversation's handoff status changes."""
+    return f"handoff:{conversation_uuid}"
 
 
 class HandoffService:
     """Service for managing customer service handoff requests"""
     
+    async def publish_handoff_status(self, conversation_uuid: str, handoff_status: str) -> None:
+        """Tell open chat sockets about a committed handoff status change.
+
+        Call it after the commit; the create/accept methods leave it to their
+        (async) callers so the publish doesn't block the event loop.
+        """
+        try:
+            await redis_client.publish(handoff_channel(conversation_uuid), handoff_status)
+        except RedisError as e:
+            logger.warning(f"Redis unavailable for handoff status updates: {e}")
+    
+    def _get_pending_request(self, conversation_uuid: str, session: Session) -> Optional[HandoffRequest]:
+        """The pending handoff request of a conversation, if any."""
+        return session.exec(
+            select(HandoffRequest)
+            .where(HandoffRequest.conversation_uuid == conversation_uuid)
+            .where(HandoffRequest.status == "pending")
+        ).first()
+    
     def create_handoff_request(
         self,
         conversation_uuid: str,
@@ -16,11 +47,7 @@ class HandoffService:
     ) -> HandoffRequest:
         """Create a new handoff request"""
         # Check if request already exists
-        existing = session.exec(
-            select(HandoffRequest)
-            .where(HandoffRequest.conversation_uuid == conversation_uuid)
-            .where(HandoffRequest.status == "pending")
-        ).first()
+        existing = self._get_pending_request(conversation_uuid, session)
         
         if existing:
             return existing
@@ -41,7 +68,18 @@ class HandoffService:
             conversation.handoff_status = "requested"
             session.add(conversation)
         
-        session.add(handoff_request)
+        # Insert in a savepoint so losing a race doesn't roll back the caller's pending work
+        try:
+            with session.begin_nested():
+                session.add(handoff_request)
+        except IntegrityError:
+            # A concurrent request created the pending row first
+            # (uq_handoff_requests_conversation_uuid_pending): return that one
+            existing = self._get_pending_request(conversation_uuid, session)
+            if existing is None:
+                raise
+            session.commit()
+            return existing
         session.commit()
         session.refresh(handoff_request)
         
@@ -110,6 +148,7 @@ class HandoffService:
             select(HandoffRequest)
             .where(HandoffRequest.conversation_uuid == conversation_uuid)
             .order_by(HandoffRequest.requested_at.desc())
+            .options(raiseload("*"))
         ).first()
     
     def send_agent_message(
@@ -3,6 +3,7 @@ from typing import List, Dict
 from pinecone import Pinecone, ServerlessSpec
 import openai
 import logging
+from app.services.cache_service import cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +105,9 @@ class PineconeService:
             except Exception as e:
                 logger.error(f"Failed to upsert batch to Pinecone: {str(e)}")
                 raise
+        
+        # Cached chat answers may be stale now
+        cache_service.invalidate_responses(chatbot_uuid)
     
     def query_chatbot_context(
         self,
@@ -146,6 +150,7 @@ class PineconeService:
                 namespace=chatbot_uuid
             )
             logger.info(f"Deleted vectors for document {document_id} in namespace {chatbot_uuid}")
+            cache_service.invalidate_responses(chatbot_uuid)
         except Exception as e:
             logger.error(f"Failed to delete document vectors: {str(e)}")
             raise
@@ -158,6 +163,7 @@ class PineconeService:
                 namespace=chatbot_uuid
             )
             logger.info(f"Deleted vectors for {source_type} {source_id} in namespace {chatbot_uuid}")
+            cache_service.invalidate_responses(chatbot_uuid)
         except Exception as e:
             logger.error(f"Failed to delete source vectors: {str(e)}")
             raise
@@ -167,6 +173,7 @@ class PineconeService:
         try:
             self.index.delete(delete_all=True, namespace=chatbot_uuid)
             logger.info(f"Deleted entire namespace {chatbot_uuid}")
+            cache_service.invalidate_responses(chatbot_uuid)
         except Exception as e:
             logger.error(f"Failed to delete namespace {chatbot_uuid}: {str(e)}")
             raise
@@ -1,9 +1,27 @@
 from fastapi import WebSocket
-from typing import Dict, Set, Optional
-import json
+from typing import Dict, Set, Optional, Tuple
+import asyncio
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+# Messages a connection may have waiting to be sent; a client that falls
+# further behind is disconnected
+OUTBOUND_QUEUE_SIZE = 256
 
 
 class ConnectionManager:
+    """Tracks chat WebSocket connections and delivers messages to them.
+
+    Every connection has an outbound queue drained by its own writer task, so
+    sending never waits on the network. Messages are JSON-encoded once when
+    sent, however many connections receive them, and queued as text. Messages
+    that pile up while a frame is being written go out together as one JSON
+    array frame; clients accept both single-object and array frames.
+    """
+
     def __init__(self):
         # Store active connections by session_id (for widget connections)
         self.active_connections: Dict[str, Set[WebSocket]] = {}
@@ -11,18 +29,23 @@ class ConnectionManager:
         self.dashboard_connections: Dict[str, Set[WebSocket]] = {}
         # Map session_id to chatbot_uuid for dashboard connections
         self.dashboard_session_map: Dict[str, str] = {}
+        # Outbound queue, writer task and session_id per connection
+        self.outboxes: Dict[WebSocket, Tuple[asyncio.Queue, asyncio.Task, str]] = {}
     
     async def connect(self, websocket: WebSocket, session_id: str, chatbot_uuid: Optional[str] = None):
         """Accept WebSocket connection and add to session group"""
         await websocket.accept()
         
+        queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.outboxes[websocket] = (queue, asyncio.create_task(self._write(websocket, queue, session_id)), session_id)
+        
         # Track dashboard connections separately
         if chatbot_uuid and session_id.startswith("dashboard_"):
             if chatbot_uuid not in self.dashboard_connections:
                 self.dashboard_connections[chatbot_uuid] = set()
             self.dashboard_connections[chatbot_uuid].add(websocket)
             self.dashboard_session_map[session_id] = chatbot_uuid
-            print(f"[MANAGER] Dashboard connection registered for chatbot {chatbot_uuid}, session {session_id}")
+            logger.info(f"Dashboard connection registered for chatbot {chatbot_uuid}, session {session_id}")
         else:
             # Regular widget connections
             if session_id not in self.active_connections:
@@ -31,6 +54,10 @@ class ConnectionManager:
     
     def disconnect(self, websocket: WebSocket, session_id: str):
         """Remove WebSocket connection from session group"""
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox is not None and outbox[1] is not asyncio.current_task():
+            outbox[1].cancel()
+        
         # Remove from dashboard connections
         if session_id in self.dashboard_session_map:
             chatbot_uuid = self.dashboard_session_map[session_id]
@@ -39,7 +66,7 @@ class ConnectionManager:
                 if not self.dashboard_connections[chatbot_uuid]:
                     del self.dashboard_connections[chatbot_uuid]
             del self.dashboard_session_map[session_id]
-            print(f"[MANAGER] Dashboard connection removed for chatbot {chatbot_uuid}, session {session_id}")
+            logger.info(f"Dashboard connection removed for chatbot {chatbot_uuid}, session {session_id}")
         else:
             # Remove from regular connections
             if session_id in self.active_connections:
@@ -47,52 +74,77 @@ class ConnectionManager:
                 if not self.active_connections[session_id]:
                     del self.active_connections[session_id]
     
+    def enqueue(self, websocket: WebSocket, message: dict) -> None:
+        """Queue a message for one connection without waiting for the network"""
+        self._enqueue_encoded(websocket, self._encode(message))
+    
+    def _enqueue_encoded(self, websocket: WebSocket, encoded: str) -> None:
+        outbox = self.outboxes.get(websocket)
+        if outbox is None:
+            return
+        queue, _, session_id = outbox
+        try:
+            queue.put_nowait(encoded)
+        except asyncio.QueueFull:
+            logger.warning(f"Client too slow, dropping connection for session {session_id}")
+            self.disconnect(websocket, session_id)
+            # 1013 (try again later): the widget reconnects
+            asyncio.create_task(websocket.close(code=1013))
+    
+    @staticmethod
+    def _encode(message: dict) -> str:
+        # Compact UTF-8 JSON, like WebSocket.send_json
+        return orjson.dumps(message).decode()
+    
+    async def _write(self, websocket: WebSocket, queue: asyncio.Queue, session_id: str):
+        """Send queued messages, batching whatever piled up during the previous send"""
+        try:
+            while True:
+                encoded = await queue.get()
+                if queue.empty():
+                    await websocket.send_text(encoded)
+                    continue
+                batch = [encoded]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                await websocket.send_text(f"[{','.join(batch)}]")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error sending message: {e}")
+            # Remove dead connections
+            self.disconnect(websocket, session_id)
+    
     async def send_message(self, message: dict, session_id: str):
         """Send message to all connections in a session"""
-        if session_id in self.active_connections:
-            # Create list to avoid modification during iteration
-            connections = list(self.active_connections[session_id])
-            
-            for connection in connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error sending message: {e}")
-                    # Remove dead connections
-                    self.disconnect(connection, session_id)
+        connections = self.active_connections.get(session_id)
+        if not connections:
+            return
+        encoded = self._encode(message)
+        # Create list to avoid modification during iteration
+        for connection in list(connections):
+            self._enqueue_encoded(connection, encoded)
     
     async def broadcast_to_dashboard(self, message: dict, chatbot_uuid: str):
         """Broadcast message to all dashboard connections for a specific chatbot (like WhatsApp)
         Only broadcasts if there are active dashboard connections (optimization)"""
         if chatbot_uuid not in self.dashboard_connections or not self.dashboard_connections[chatbot_uuid]:
             # No dashboard connections, skip broadcast (optimization)
-            print("we sent nothing")
             return
         
         connections = list(self.dashboard_connections[chatbot_uuid])
-        print(f"[MANAGER] Broadcasting to {len(connections)} dashboard connection(s) for chatbot {chatbot_uuid}")
+        logger.debug("Broadcasting to %d dashboard connection(s) for chatbot %s", len(connections), chatbot_uuid)
         
+        encoded = self._encode(message)
         for connection in connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"[MANAGER] Error broadcasting to dashboard: {e}")
-                # Remove dead connections - find session_id for this connection
-                for sid, chatbot_uuid_map in self.dashboard_session_map.items():
-                    if chatbot_uuid_map == chatbot_uuid:
-                        # Find the websocket in the set and remove it
-                        if chatbot_uuid in self.dashboard_connections:
-                            self.dashboard_connections[chatbot_uuid].discard(connection)
-                        break
+            self._enqueue_encoded(connection, encoded)
     
     async def broadcast(self, message: dict):
         """Broadcast message to all active connections"""
-        for session_connections in self.active_connections.values():
-            for connection in session_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error broadcasting message: {e}")
+        encoded = self._encode(message)
+        for session_connections in list(self.active_connections.values()):
+            for connection in list(session_connections):
+                self._enqueue_encoded(connection, encoded)
 
 
 # Global connection manager instance
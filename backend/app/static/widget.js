@@ -2041,7 +2041,8 @@
         console.log("[WIDGET] ✅ Received WebSocket message:", event.data);
         const data = JSON.parse(event.data);
         console.log("[WIDGET] Parsed data:", data);
-        handleWebSocketMessage(data);
+        // Messages queued together on the server arrive as one array frame
+        (Array.isArray(data) ? data : [data]).forEach(handleWebSocketMessage);
       };
 
       websocket.onerror = (error) => {
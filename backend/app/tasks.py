@@ -16,6 +16,7 @@ from app.models import (
 )
 from app.services.file_processor import FileProcessor
 from app.services.pinecone_service import PineconeService
+from app.services.cache_service import cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -128,6 +129,9 @@ def process_document_task(self, document_id: int, chatbot_uuid: str, user_uuid:
             db.add(task_record)
             db.commit()
         
+        # Cached chat answers may be stale now
+        cache_service.invalidate_responses(chatbot_uuid)
+        
         # Update document status
         document.chunk_count = len(chunks)
         document.status = "completed"
@@ -312,6 +316,7 @@ def crawl_website_task(self, website_link_id: int, chatbot_uuid: str, user_uuid:
                 vectors=batch,
                 namespace=chatbot_uuid
             )
+        cache_service.invalidate_responses(chatbot_uuid)
         
         chunk_count = len(chunks)
         
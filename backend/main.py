@@ -1,13 +1,13 @@
 from fastapi import FastAPI, Request, status
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from sqlmodel import SQLModel
-from app.database import engine, create_db_and_tables
+from app.database import engine, async_engine, create_db_and_tables
+from app.redis_client import redis_client, sync_redis_client
+from app.services.handoff_listener import handoff_listener
 from app.api.auth_routes import router as auth_router
 from app.api.chatbot_routes import router as chatbot_router
-from app.api.document_routes import router as document_router
 from app.api.routes.chat import router as chat_router
 from app.api.routes.website_links import router as website_links_router
 from app.api.routes.handoff import router as handoff_router
@@ -17,13 +17,24 @@ from app.api.routes.tickets import router as tickets_router
 from app.api.routes.tasks import router as tasks_router
 from app.api.routes.workspaces import router as workspaces_router
 from app.api.routes.admin import router as admin_router
+from app.middleware import PublicCORSMiddleware
+import atexit
+from contextlib import asynccontextmanager
 import logging
 import os
-
-# Configure logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Configure logging: records are formatted and queued by the caller, and a
+# listener thread writes them out, so logging never blocks the event loop on stderr
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -31,12 +42,31 @@ logger = logging.getLogger(__name__)
 # Run: alembic upgrade head
 # create_db_and_tables()  # Disabled - use migrations instead
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the worker's shared Redis and database pools on shutdown.
+
+    Every handler uses the module-level clients from app.redis_client and
+    app.database, so each worker holds exactly one pool of each.
+    """
+    yield
+    await handoff_listener.close()
+    await redis_client.aclose()
+    sync_redis_client.close()
+    await async_engine.dispose()
+    engine.dispose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Chatbot Builder API",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    # Serialize responses with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration - restrict in production
@@ -47,8 +77,15 @@ ALLOWED_ORIGINS = [
     "http://127.0.0.1:3001",
 ]
 
+# Widget endpoints are fetched cross-origin from any customer site
+PUBLIC_CORS_PATHS = [
+    r"/api/chatbots/[^/]+/public",
+    r"/api/chat/messages/[^/]+/feedback",
+]
+
 app.add_middleware(
-    CORSMiddleware,
+    PublicCORSMiddleware,
+    public_paths=PUBLIC_CORS_PATHS,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
@@ -113,7 +150,6 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Include routes
 app.include_router(auth_router, prefix="/api")
 app.include_router(chatbot_router, prefix="/api")
-app.include_router(document_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
 app.include_router(website_links_router, prefix="/api/chatbots", tags=["Website Links"])
 app.include_router(handoff_router, prefix="/api")
@@ -202,7 +202,7 @@ export default function ActivityPage({ params }: ActivityPageProps) {
   const [loading, setLoading] = useState(true);
   const [loadingMore, setLoadingMore] = useState(false);
   const [hasMore, setHasMore] = useState(true);
-  const [offset, setOffset] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState<"requests" | "chats">("requests");
   const [messageInput, setMessageInput] = useState("");
   const [sendingMessage, setSendingMessage] = useState(false);
@@ -276,29 +276,36 @@ export default function ActivityPage({ params }: ActivityPageProps) {
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
+          const parsed = JSON.parse(event.data);
+          // Messages queued together on the server arrive as one array frame,
+          // and the updates of one chat turn arrive as a single "turn" event
+          const frames = (Array.isArray(parsed) ? parsed : [parsed]).flatMap(
+            (data) => (data.type === "turn" ? data.events : [data])
+          );
 
-          // Ignore connection confirmation
-          if (data.type === "connection" || data.type === "pong") {
-            return;
-          }
+          for (const data of frames) {
+            // Ignore connection confirmation
+            if (data.type === "connection" || data.type === "pong") {
+              continue;
+            }
 
-          // Handle real-time updates (like WhatsApp)
-          if (data.type === "conversation_created") {
-            console.log(
-              "[Dashboard] New conversation created, refreshing list"
-            );
-            fetchConversations(true); // Reset to show new conversation at top
-          } else if (data.type === "new_message") {
-            console.log("[Dashboard] New message received, refreshing");
-            // Refresh conversations to update last_message (reset to get updated order)
-            fetchConversations(true);
-            // If message is for selected conversation, refresh messages
-            if (
-              selectedConversation &&
-              data.conversation_uuid === selectedConversation.uuid
-            ) {
-              fetchMessages(selectedConversation.uuid);
+            // Handle real-time updates (like WhatsApp)
+            if (data.type === "conversation_created") {
+              console.log(
+                "[Dashboard] New conversation created, refreshing list"
+              );
+              fetchConversations(true); // Reset to show new conversation at top
+            } else if (data.type === "new_message") {
+              console.log("[Dashboard] New message received, refreshing");
+              // Refresh conversations to update last_message (reset to get updated order)
+              fetchConversations(true);
+              // If message is for selected conversation, refresh messages
+              if (
+                selectedConversation &&
+                data.conversation_uuid === selectedConversation.uuid
+              ) {
+                fetchMessages(selectedConversation.uuid);
+              }
             }
           }
         } catch (error) {
@@ -394,7 +401,7 @@ export default function ActivityPage({ params }: ActivityPageProps) {
       }
       observer.disconnect();
     };
-  }, [hasMore, loadingMore, activeTab, chatbotId, offset]);
+  }, [hasMore, loadingMore, activeTab, chatbotId, nextCursor]);
 
   useEffect(() => {
     if (selectedConversation) {
@@ -539,15 +546,18 @@ export default function ActivityPage({ params }: ActivityPageProps) {
 
       // Reset state if needed
       if (reset) {
-        setOffset(0);
+        setNextCursor(null);
         setHasMore(true);
       }
 
-      const currentOffset = reset ? 0 : offset;
+      // Keyset pagination: continue after the last conversation of the previous page
+      const cursor = reset ? null : nextCursor;
       const API_URL =
         process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
       const response = await fetch(
-        `${API_URL}/api/chat/${chatbotId}/conversations?limit=10&offset=${currentOffset}`,
+        `${API_URL}/api/chat/${chatbotId}/conversations?limit=10${
+          cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""
+        }`,
         {
           headers: {
             Authorization: `Bearer ${token}`,
@@ -566,16 +576,15 @@ export default function ActivityPage({ params }: ActivityPageProps) {
       if (data.conversations && Array.isArray(data.conversations)) {
         if (reset) {
           setConversations(data.conversations);
-          setOffset(data.conversations.length);
           // Auto-select first conversation if none selected
           if (data.conversations.length > 0 && !selectedConversation) {
             setSelectedConversation(data.conversations[0]);
           }
         } else {
           setConversations((prev) => [...prev, ...data.conversations]);
-          setOffset((prev) => prev + data.conversations.length);
         }
 
+        setNextCursor(data.next_cursor || null);
         setHasMore(data.has_more || false);
 
         // Update selected conversation if it exists in the new data
@@ -594,7 +603,7 @@ export default function ActivityPage({ params }: ActivityPageProps) {
         console.error("Expected paginated response but got:", data);
         if (reset) {
           setConversations([]);
-          setOffset(0);
+          setNextCursor(null);
           setHasMore(false);
         }
       }
@@ -330,20 +330,24 @@ export default function PlaygroundPage({ params }: PlaygroundPageProps) {
     };
 
     ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-
-      if (data.type === "message" && data.role === "assistant") {
-        setMessages((prev) => [
-          ...prev,
-          {
-            role: "assistant",
-            content: data.content,
-            timestamp: data.timestamp,
-          },
-        ]);
-        setIsTyping(false);
-      } else if (data.type === "typing") {
-        setIsTyping(data.is_typing);
+      const parsed = JSON.parse(event.data);
+      // Messages queued together on the server arrive as one array frame
+      const frames = Array.isArray(parsed) ? parsed : [parsed];
+
+      for (const data of frames) {
+        if (data.type === "message" && data.role === "assistant") {
+          setMessages((prev) => [
+            ...prev,
+            {
+              role: "assistant",
+              content: data.content,
+              timestamp: data.timestamp,
+            },
+          ]);
+          setIsTyping(false);
+        } else if (data.type === "typing") {
+          setIsTyping(data.is_typing);
+        }
       }
     };
 